@@ -0,0 +1,112 @@
+"""
+@author Tom Butler
+@date 2025-10-23
+@description Persistent cache for parsed syntax trees.
+             Reuses tree-sitter results across /analyze requests; /analyze/validate parses directly via validate_only.
+             Entries live in memory unless ast_cache_dir names an absolute directory for the disk tier.
+"""
+import logging
+import os
+import pickle
+import tempfile
+from typing import Any, Callable, Dict, Optional
+
+from services import TTLCache, content_key
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class ASTCache:
+    """
+    Two-level syntax tree cache: an in-memory LRU optionally backed by pickle files on disk.
+
+    Disk entries are unpickled when read, so anyone who can write to the
+    directory can run code in the service. Only absolute paths are accepted,
+    the directory is created private to the service user, and it must not be
+    shared with less trusted processes.
+
+    Disk entries are written atomically so concurrent workers never read partial files.
+    Disk failures are logged and treated as cache misses.
+    """
+
+    def __init__(self, directory: Optional[str], maxsize: int = 256):
+        self.directory = directory or None
+        self._memory = TTLCache(maxsize=maxsize)
+
+        if self.directory and not os.path.isabs(self.directory):
+            logger.warning("AST cache directory %r is not absolute, using memory only", self.directory)
+            self.directory = None
+
+        if self.directory:
+            try:
+                os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            except OSError as e:
+                logger.warning("AST cache directory unavailable, using memory only: %s", e)
+                self.directory = None
+
+    def get_or_parse(
+        self,
+        code: str,
+        lang: str,
+        parse: Callable[[str, str], Dict[str, Any]],
+        version: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Returns the cached syntax result for code, parsing it on a miss.
+
+        Args:
+            code: Source code to parse
+            lang: Programming language identifier
+            parse: Parser callable taking (code, lang) and returning the syntax result
+            version: Parser or grammar version; entries from other versions are never reused
+
+        Returns:
+            Dictionary with valid flag, issues list, and AST structure
+        """
+        key = content_key(code, lang, version)
+
+        result = self._memory.get(key)
+        if result is not None:
+            return result
+
+        result = self._read(key)
+        if result is None:
+            result = parse(code, lang)
+            self._write(key, result)
+
+        self._memory.set(key, result)
+        return result
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key.replace(":", "_") + ".pkl")
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.directory:
+            return None
+
+        try:
+            with open(self._path(key), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Could not read AST cache entry: %s", e)
+            return None
+
+    def _write(self, key: str, result: Dict[str, Any]) -> None:
+        if not self.directory:
+            return
+
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(result, f, protocol=5)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            logger.warning("Could not write AST cache entry: %s", e)
+
+
+ast_cache = ASTCache(settings.ast_cache_dir, maxsize=settings.ast_cache_size)
+
@@ -0,0 +1,48 @@
+"""
+@author Tom Butler
+@date 2025-10-23
+@description Lightweight route class for parameterless endpoints.
+             Calls the endpoint directly, skipping FastAPI's per-request dependency solving.
+"""
+from typing import Any, Callable, Coroutine
+import inspect
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+
+class FastRoute(APIRoute):
+    """
+    APIRoute that bypasses dependency resolution for endpoints taking no inputs.
+
+    Only applies to async endpoints that declare no parameters, body or
+    dependencies; these must return a Response themselves. Any other endpoint
+    falls back to the standard FastAPI handler, so a router can use this
+    class for all of its routes.
+    """
+
+    def _is_parameterless(self) -> bool:
+        dependant = self.dependant
+        return inspect.iscoroutinefunction(dependant.call) and not (
+            dependant.path_params
+            or dependant.query_params
+            or dependant.header_params
+            or dependant.cookie_params
+            or dependant.body_params
+            or dependant.dependencies
+            or dependant.request_param_name
+            or dependant.http_connection_param_name
+            or dependant.response_param_name
+            or dependant.background_tasks_param_name
+        )
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        if not self._is_parameterless():
+            return super().get_route_handler()
+
+        endpoint = self.dependant.call
+
+        async def handler(request: Request) -> Response:
+            return await endpoint()
+
+        return handler
@@ -4,18 +4,163 @@
 @description Code analysis API endpoints.
              Provides syntax validation, complexity metrics, and code formatting.
 """
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from functools import lru_cache
+from typing import List
+import asyncio
 import logging
 
-from models import AnalysisRequest, AnalysisResponse, ErrorResponse
-from services import CodeAnalyzerService
+from models import AnalysisRequest, AnalysisResponse, BatchAnalysisRequest, CodeMetrics, ErrorResponse
+from services import CodeAnalyzerService, GRAMMAR_VERSION, TTLCache, content_key
 from config import get_settings
+from ._ast_cache import ast_cache
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-analyzer_service = CodeAnalyzerService()
+
+@lru_cache(maxsize=1)
+def get_analyzer_service() -> CodeAnalyzerService:
+    """
+    Returns the shared CodeAnalyzerService, creating it on first use.
+
+    Injected into handlers with Depends so tests can override it through
+    main.app.dependency_overrides, and module import does not pay for
+    parser initialisation.
+    """
+    return CodeAnalyzerService(syntax_cache=ast_cache)
+
+
+# Analysis results keyed by code hash, language and check flags
+analysis_cache = TTLCache(
+    maxsize=settings.analysis_cache_size,
+    ttl=settings.analysis_cache_ttl
+)
+
+
+@lru_cache(maxsize=256)
+def _performance_score(complexity: int) -> int:
+    """Simple heuristic: each complexity point costs 5 of 100 performance points."""
+    return max(0, min(100, 100 - (complexity * 5)))
+
+
+# One bit per CodeMetrics field, above the four check flags
+_METRIC_BITS = {name: 1 << shift for shift, name in enumerate(CodeMetrics.model_fields, start=4)}
+_ALL_METRIC_BITS = sum(_METRIC_BITS.values())
+
+
+def _flags_bitmask(request: AnalysisRequest) -> int:
+    """Packs the analysis check flags and requested metrics into a single integer for cache keys."""
+    if request.metrics_subset is None:
+        metric_bits = _ALL_METRIC_BITS
+    else:
+        metric_bits = sum(_METRIC_BITS[name] for name in request.metrics_subset)
+
+    return (
+        request.check_syntax
+        | request.check_complexity << 1
+        | request.suggest_improvements << 2
+        | request.format_code << 3
+        | metric_bits
+    )
+
+
+def _analysis_etag(request: AnalysisRequest) -> str:
+    """
+    Builds a strong ETag for an analysis request.
+
+    Analysis is deterministic for a given code, language, flag set, app
+    version and parser grammar, so the tag is derived from those and a match
+    can skip the analysis entirely.
+    """
+    key = content_key(
+        request.code,
+        request.language.value,
+        _flags_bitmask(request),
+        settings.app_version,
+        GRAMMAR_VERSION
+    )
+    return '"' + key.replace(":", "-") + '"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Checks an If-None-Match header value (possibly a list) against etag.
+
+    "*" is not honoured: a POST has no stored representation for it to match,
+    so only an exact tag from an earlier response skips the analysis.
+    """
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return any(tag == etag for tag in candidates)
+
+
+async def run_analysis(request: AnalysisRequest, analyzer_service: CodeAnalyzerService) -> dict:
+    """
+    Runs the analyzer, reusing a cached result for identical requests.
+
+    Cache misses run in a worker thread so parsing and formatting
+    do not block the event loop for other requests.
+
+    Args:
+        request: Analysis request with code and configuration flags
+        analyzer_service: Analyzer used on a cache miss
+
+    Returns:
+        Analysis result dictionary from CodeAnalyzerService
+    """
+    key = content_key(request.code, request.language.value, _flags_bitmask(request))
+    analysis_result = analysis_cache.get(key)
+    if analysis_result is None:
+        analysis_result = await asyncio.to_thread(analyzer_service.analyze_code, request)
+        analysis_cache.set(key, analysis_result)
+    return analysis_result
+
+
+def build_analysis_response(request: AnalysisRequest, analysis_result: dict) -> AnalysisResponse:
+    """
+    Converts an analyzer result into the API response model.
+
+    Args:
+        request: Analysis request the result belongs to
+        analysis_result: Result dictionary from CodeAnalyzerService
+
+    Returns:
+        AnalysisResponse with defaults filled in for skipped checks
+    """
+    # Extract metrics, using defaults for any that were skipped
+    metrics = analysis_result.get("metrics")
+
+    complexity = 1
+    readability = 85.0
+    lines_of_code = 0
+    if metrics:
+        if metrics.cyclomatic_complexity is not None:
+            complexity = metrics.cyclomatic_complexity
+        if metrics.readability_score is not None:
+            readability = metrics.readability_score
+        if metrics.lines_of_code is not None:
+            lines_of_code = metrics.lines_of_code
+
+    # Calculate performance score based on complexity
+
+    performance_score = _performance_score(complexity)
+
+    logger.debug("Analysis result: valid=%s, complexity=%s", analysis_result.get("valid"), complexity)
+
+    return AnalysisResponse.model_construct(
+        syntax_valid=analysis_result.get("valid", True),
+        language=request.language.value,
+        complexity=complexity,
+        readability_score=readability,
+        performance_score=performance_score,
+        lines_of_code=lines_of_code,
+        syntax_errors=analysis_result.get("issues", []),
+        suggestions=analysis_result.get("suggestions", []),
+        metrics=metrics,
+        formatted_code=analysis_result.get("formatted_code"),
+        ast_structure=analysis_result.get("ast_structure")
+    )
 
 
 @router.post(
@@ -27,12 +172,22 @@ analyzer_service = CodeAnalyzerService()
         500: {"model": ErrorResponse, "description": "Internal Server Error"}
     }
 )
-async def analyze_code(request: AnalysisRequest):
+async def analyze_code(
+    request: AnalysisRequest,
+    http_request: Request,
+    response: Response,
+    analyzer_service: CodeAnalyzerService = Depends(get_analyzer_service)
+):
     """
     Analyses code for syntax validity, complexity, and quality metrics.
 
+    Sets an ETag derived from the request; a matching If-None-Match header
+    returns 304 Not Modified without re-running the analysis.
+
     Args:
         request: Analysis request with code and configuration flags
+        http_request: Raw request, used to read If-None-Match
+        response: Outgoing response, used to set caching headers
 
     Returns:
         AnalysisResponse with validation results, metrics, and suggestions
@@ -41,55 +196,93 @@ async def analyze_code(request: AnalysisRequest):
         HTTPException: If validation or analysis fails
     """
     try:
-        logger.info(f"Analysing {request.language.value} code")
+        logger.info("Analysing %s code", request.language.value)
 
-        analysis_result = analyzer_service.analyze_code(request)
+        etag = _analysis_etag(request)
+        cache_headers = {"ETag": etag, "Cache-Control": "private, max-age=60"}
 
-        # Extract metrics or use defaults
-        metrics = analysis_result.get("metrics")
+        if_none_match = http_request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
 
-        # Calculate performance score based on complexity
-        if metrics:
-            complexity = metrics.cyclomatic_complexity
-            readability = metrics.readability_score
-            lines_of_code = metrics.lines_of_code
-        else:
-            complexity = 1
-            readability = 85.0
-            lines_of_code = 0
-
-        performance_score = max(0, min(100, 100 - (complexity * 5)))  # Simple heuristic
-
-        logger.debug(f"Analysis result: valid={analysis_result.get('valid')}, complexity={complexity}")
-
-        return AnalysisResponse(
-            syntax_valid=analysis_result.get("valid", True),
-            language=request.language.value,
-            complexity=complexity,
-            readability_score=readability,
-            performance_score=performance_score,
-            lines_of_code=lines_of_code,
-            syntax_errors=analysis_result.get("issues", []),
-            suggestions=analysis_result.get("suggestions", []),
-            metrics=metrics,
-            formatted_code=analysis_result.get("formatted_code"),
-            ast_structure=analysis_result.get("ast_structure")
-        )
+        response.headers.update(cache_headers)
+
+        analysis_result = await run_analysis(request, analyzer_service)
+
+        return build_analysis_response(request, analysis_result)
 
     except ValueError as e:
-        logger.error(f"Code analysis validation error: {str(e)}")
+        logger.error("Code analysis validation error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid request data: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Code analysis failed: {str(e)}")
+        logger.error("Code analysis failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Code analysis failed: {str(e)}"
         )
 
 
+@router.post(
+    "/analyze/batch",
+    response_model=List[AnalysisResponse],
+    status_code=status.HTTP_200_OK,
+    responses={
+        400: {"model": ErrorResponse, "description": "Bad Request"},
+        500: {"model": ErrorResponse, "description": "Internal Server Error"}
+    }
+)
+async def analyze_batch(
+    batch_request: BatchAnalysisRequest,
+    analyzer_service: CodeAnalyzerService = Depends(get_analyzer_service)
+):
+    """
+    Analyses several files in one call, in parallel.
+
+    Cached results are reused; only the misses are handed to the analyzer's
+    batch path, which spreads them across worker threads or processes.
+
+    Args:
+        batch_request: Analysis requests, one per file
+
+    Returns:
+        AnalysisResponse list in request order
+
+    Raises:
+        HTTPException: If analysis fails
+    """
+    try:
+        requests = batch_request.requests
+        logger.info("Analysing batch of %d files", len(requests))
+
+        keys = [
+            content_key(request.code, request.language.value, _flags_bitmask(request))
+            for request in requests
+        ]
+        results = [analysis_cache.get(key) for key in keys]
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            fresh = await analyzer_service.analyze_batch([requests[i] for i in missing])
+            for i, result in zip(missing, fresh):
+                analysis_cache.set(keys[i], result)
+                results[i] = result
+
+        return [
+            build_analysis_response(request, result)
+            for request, result in zip(requests, results)
+        ]
+
+    except Exception as e:
+        logger.error("Batch code analysis failed: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch code analysis failed: {str(e)}"
+        )
+
+
 @router.post(
     "/analyze/format",
     response_model=dict,
@@ -99,23 +292,25 @@ async def analyze_code(request: AnalysisRequest):
         500: {"model": ErrorResponse, "description": "Internal Server Error"}
     }
 )
-async def format_code(request: AnalysisRequest):
+async def format_code(
+    request: AnalysisRequest,
+    analyzer_service: CodeAnalyzerService = Depends(get_analyzer_service)
+):
     """Format code according to language standards"""
     try:
-        logger.info(f"Formatting {request.language.value} code")
-        logger.debug(f"Format request: language={request.language.value}, code_length={len(request.code)}")
-
-        # Create a modified request with format_code=True
-        format_request = AnalysisRequest(
-            code=request.code,
-            language=request.language,
-            check_syntax=False,
-            check_complexity=False,
-            suggest_improvements=False,
-            format_code=True
-        )
+        logger.info("Formatting %s code", request.language.value)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Format request: language=%s, code_length=%d", request.language.value, len(request.code))
+
+        # Copy the validated request with only formatting enabled (skips re-validation)
+        format_request = request.model_copy(update={
+            "check_syntax": False,
+            "check_complexity": False,
+            "suggest_improvements": False,
+            "format_code": True
+        })
 
-        analysis_result = analyzer_service.analyze_code(format_request)
+        analysis_result = await run_analysis(format_request, analyzer_service)
 
         if not analysis_result.get("formatted_code"):
             raise HTTPException(
@@ -129,7 +324,7 @@ async def format_code(request: AnalysisRequest):
         }
 
     except Exception as e:
-        logger.error(f"Code formatting failed: {str(e)}")
+        logger.error("Code formatting failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Code formatting failed: {str(e)}"
@@ -145,31 +340,29 @@ async def format_code(request: AnalysisRequest):
         500: {"model": ErrorResponse, "description": "Internal Server Error"}
     }
 )
-async def validate_syntax(request: AnalysisRequest):
+async def validate_syntax(
+    request: AnalysisRequest,
+    analyzer_service: CodeAnalyzerService = Depends(get_analyzer_service)
+):
     """Validate code syntax"""
     try:
-        logger.info(f"Validating {request.language.value} code syntax")
-
-        # Create a modified request with only syntax checking
-        validate_request = AnalysisRequest(
-            code=request.code,
-            language=request.language,
-            check_syntax=True,
-            check_complexity=False,
-            suggest_improvements=False,
-            format_code=False
-        )
+        logger.info("Validating %s code syntax", request.language.value)
 
-        analysis_result = analyzer_service.analyze_code(validate_request)
+        # Syntax-only check: no metrics, suggestions, formatting or AST conversion
+        valid, issues = await asyncio.to_thread(
+            analyzer_service.validate_only,
+            request.code,
+            request.language.value
+        )
 
         return {
-            "valid": analysis_result["valid"],
+            "valid": valid,
             "language": request.language.value,
-            "issues": analysis_result.get("issues", [])
+            "issues": issues
         }
 
     except Exception as e:
-        logger.error(f"Syntax validation failed: {str(e)}")
+        logger.error("Syntax validation failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Syntax validation failed: {str(e)}"
@@ -4,27 +4,77 @@
 @description Code generation API endpoints.
              Accepts user's OpenAI API key via Authorization header and generates code, tests, docs.
 """
-from fastapi import APIRouter, HTTPException, status, BackgroundTasks, Header
-from typing import List, Optional
-import uuid
+from fastapi import APIRouter, HTTPException, status, Header
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import hashlib
+import itertools
+import os
 import time
 import logging
 import asyncio
+import orjson
 
 from models import (
     GenerationRequest,
     GenerationResponse,
     BatchGenerationRequest,
     GenerationStatus,
-    ErrorResponse
+    ErrorResponse,
+    TestResult,
+    Documentation,
+    CodeMetrics
 )
-from services import CodeGeneratorService
+from services import CodeFenceExtractor, CodeGeneratorService, TTLCache
 from config import get_settings
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+_BEARER_PREFIX = "Bearer "
+_ERR_MISSING_AUTH = "OpenAI API key is required. Please provide it in the Authorization header."
+_ERR_BAD_AUTH = "Invalid authorization header format. Use 'Bearer <api_key>'"
+
+# Process-local sequence for generation IDs, prefixed with the worker PID
+_generation_seq = itertools.count()
+_generation_prefix = f"gen_{os.getpid():x}_"
+
+# Caps in-flight LLM generations across all batch requests on this worker
+generation_semaphore = asyncio.Semaphore(settings.max_concurrent_generations)
+
+
+def _elapsed_seconds(start_ns: int) -> float:
+    """Seconds since a perf_counter_ns() reading, rounded for responses."""
+    return round((time.perf_counter_ns() - start_ns) / 1e9, 2)
+
+
+def new_generation_id() -> str:
+    """Returns a unique generation ID without touching the OS random source."""
+    return f"{_generation_prefix}{next(_generation_seq):x}"
+
+
+# Services keyed by a hash of the API key so no plaintext keys are used as cache keys
+generator_services = TTLCache(maxsize=256, ttl=settings.generator_service_ttl)
+
+
+def get_generator_service(api_key: str) -> CodeGeneratorService:
+    """
+    Returns a shared CodeGeneratorService for the given API key.
+
+    Reusing the service keeps its LLM client and HTTP connection pool warm
+    instead of rebuilding them on every request. Entries expire after
+    generator_service_ttl seconds so revoked keys are not held indefinitely.
+    """
+    key_hash = hashlib.blake2s(api_key.encode(), digest_size=16).hexdigest()
+
+    generator_service = generator_services.get(key_hash)
+    if generator_service is None:
+        generator_service = CodeGeneratorService(api_key=api_key)
+        generator_services.set(key_hash, generator_service)
+    return generator_service
+
+
 def extract_api_key_from_header(authorization: Optional[str] = Header(None)) -> str:
     """
     Extracts OpenAI API key from Authorization Bearer token.
@@ -41,16 +91,16 @@ def extract_api_key_from_header(authorization: Optional[str] = Header(None)) ->
     if not authorization:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="OpenAI API key is required. Please provide it in the Authorization header."
+            detail=_ERR_MISSING_AUTH
         )
 
-    if not authorization.startswith("Bearer "):
+    if not authorization.startswith(_BEARER_PREFIX):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authorization header format. Use 'Bearer <api_key>'"
+            detail=_ERR_BAD_AUTH
         )
 
-    return authorization.replace("Bearer ", "").strip()
+    return authorization.removeprefix(_BEARER_PREFIX).strip()
 
 
 @router.post(
@@ -70,8 +120,9 @@ async def generate_code(
     """
     Generates code, tests, and documentation from natural language prompt.
 
-    Creates new CodeGeneratorService instance with user's API key.
-    Generates code first, then tests and docs in parallel if requested.
+    Reuses the CodeGeneratorService cached for the user's API key.
+    Requests for both tests and docs use one bundled LLM call; otherwise
+    code is generated first, then tests, docs and metrics in parallel.
 
     Args:
         request: Generation request with prompt and options
@@ -83,32 +134,20 @@ async def generate_code(
     Raises:
         HTTPException: If API key invalid or generation fails
     """
-    generation_id = f"gen_{uuid.uuid4().hex[:8]}"
-    start_time = time.time()
+    generation_id = new_generation_id()
+    start_ns = time.perf_counter_ns()
 
     try:
         api_key = extract_api_key_from_header(authorization)
 
-        # Service instance created per request with user's API key
-        generator_service = CodeGeneratorService(api_key=api_key)
-
-        logger.info(f"Starting generation {generation_id} for {request.programming_language.value}")
-
-        code = await generator_service.generate_code(request)
-
-        tests = None
-        if request.include_tests:
-            tests = await generator_service.generate_tests(code, request)
+        # Service instance shared across requests using the same API key
+        generator_service = get_generator_service(api_key)
 
-        documentation = None
-        if request.include_docs:
-            documentation = await generator_service.generate_documentation(code, request)
+        logger.info("Starting generation %s for %s", generation_id, request.programming_language.value)
 
-        metrics = await generator_service.calculate_metrics(code, request.programming_language.value)
+        code, tests, documentation, metrics = await generate_all(generator_service, request)
 
-        processing_time = time.time() - start_time
-
-        return GenerationResponse(
+        return GenerationResponse.model_construct(
             id=generation_id,
             status=GenerationStatus.COMPLETED,
             code=code,
@@ -116,17 +155,169 @@ async def generate_code(
             tests=tests,
             documentation=documentation,
             metrics=metrics,
-            processing_time=round(processing_time, 2)
+            processing_time=_elapsed_seconds(start_ns)
         )
 
     except Exception as e:
-        logger.error(f"Generation {generation_id} failed: {str(e)}")
+        logger.error("Generation %s failed: %s", generation_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Code generation failed: {str(e)}"
         )
 
 
+async def _none() -> None:
+    return None
+
+
+async def generate_artifacts(
+    generator_service: CodeGeneratorService,
+    code: str,
+    request: GenerationRequest
+) -> Tuple[Optional[TestResult], Optional[Documentation], CodeMetrics]:
+    """
+    Generates tests, documentation and metrics for code concurrently.
+
+    The three steps only depend on the generated code, so running them
+    together makes the total latency the slowest call rather than the sum.
+
+    Args:
+        generator_service: Service bound to the user's API key
+        code: Generated source code
+        request: Original generation request
+
+    Returns:
+        Tuple of (tests, documentation, metrics); tests/docs are None when not requested
+    """
+    return await asyncio.gather(
+        generator_service.generate_tests(code, request) if request.include_tests else _none(),
+        generator_service.generate_documentation(code, request) if request.include_docs else _none(),
+        generator_service.calculate_metrics(code, request.programming_language.value)
+    )
+
+
+async def generate_all(
+    generator_service: CodeGeneratorService,
+    request: GenerationRequest
+) -> Tuple[str, Optional[TestResult], Optional[Documentation], CodeMetrics]:
+    """
+    Generates code and every requested artifact in as few LLM round trips as possible.
+
+    When both tests and documentation are requested, one bundled LLM call
+    returns all three artifacts. Otherwise, or if the bundled response cannot
+    be parsed, the code is generated first and the artifacts concurrently.
+
+    Args:
+        generator_service: Service bound to the user's API key
+        request: Original generation request
+
+    Returns:
+        Tuple of (code, tests, documentation, metrics)
+    """
+    if request.include_tests and request.include_docs:
+        bundle = await generator_service.generate_bundle(request)
+        if bundle is not None:
+            code, tests, documentation = bundle
+            metrics = await generator_service.calculate_metrics(code, request.programming_language.value)
+            return code, tests, documentation, metrics
+
+        logger.warning("Bundled generation response was not valid JSON; generating artifacts separately")
+
+    code = await generator_service.generate_code(request)
+    tests, documentation, metrics = await generate_artifacts(generator_service, code, request)
+    return code, tests, documentation, metrics
+
+
+def _sse_event(event: str, data: Any) -> bytes:
+    """Encodes a single Server-Sent Events frame with a JSON payload."""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+@router.post(
+    "/generate/stream",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/event-stream": {}}, "description": "Server-Sent Events stream"},
+        401: {"model": ErrorResponse, "description": "Unauthorized - API key required"}
+    }
+)
+async def generate_code_stream(
+    request: GenerationRequest,
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Streams generated code to the client as Server-Sent Events.
+
+    Emits "token" events carrying the code body as the LLM writes it, with the
+    surrounding fence and any preamble stripped, then "code" with the extracted
+    code block, followed by "tests", "documentation" and "metrics" events and a
+    final "done" event. Failures are reported as an "error" event.
+
+    Args:
+        request: Generation request with prompt and options
+        authorization: Bearer token with OpenAI API key
+
+    Returns:
+        StreamingResponse with media type text/event-stream
+
+    Raises:
+        HTTPException: If API key missing or malformed
+    """
+    api_key = extract_api_key_from_header(authorization)
+    generation_id = new_generation_id()
+
+    async def event_generator() -> AsyncIterator[bytes]:
+        start_ns = time.perf_counter_ns()
+
+        try:
+            generator_service = get_generator_service(api_key)
+
+            logger.info("Starting streamed generation %s for %s", generation_id, request.programming_language.value)
+            yield _sse_event("start", {"id": generation_id})
+
+            chunks = []
+            extractor = CodeFenceExtractor()
+            async for chunk in generator_service.generate_code_stream(request):
+                chunks.append(chunk)
+                body = extractor.feed(chunk)
+                if body:
+                    yield _sse_event("token", {"content": body})
+
+            body = extractor.flush()
+            if body:
+                yield _sse_event("token", {"content": body})
+
+            code = generator_service.extract_code("".join(chunks))
+            yield _sse_event("code", {"code": code})
+
+            if request.include_tests:
+                tests = await generator_service.generate_tests(code, request)
+                yield _sse_event("tests", tests.model_dump(mode="json"))
+
+            if request.include_docs:
+                documentation = await generator_service.generate_documentation(code, request)
+                yield _sse_event("documentation", documentation.model_dump(mode="json"))
+
+            metrics = await generator_service.calculate_metrics(code, request.programming_language.value)
+            yield _sse_event("metrics", metrics.model_dump(mode="json"))
+
+            yield _sse_event("done", {
+                "id": generation_id,
+                "processing_time": _elapsed_seconds(start_ns)
+            })
+
+        except Exception as e:
+            logger.error("Streamed generation %s failed: %s", generation_id, e)
+            yield _sse_event("error", {"id": generation_id, "error": str(e)})
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post(
     "/generate/batch",
     response_model=List[GenerationResponse],
@@ -152,67 +343,70 @@ async def generate_batch(
                 detail=f"Maximum {settings.max_concurrent_generations} concurrent generations allowed"
             )
 
-        # Process all requests concurrently
-        tasks = []
-        for request in batch_request.requests:
-            tasks.append(generate_code_async(request, api_key))
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Handle any exceptions
-        responses = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"Batch generation {i} failed: {str(result)}")
-                responses.append(
-                    GenerationResponse(
-                        id=f"gen_{uuid.uuid4().hex[:8]}",
-                        status=GenerationStatus.FAILED,
-                        language=batch_request.requests[i].programming_language.value,
-                        error=str(result)
-                    )
+        # Identical requests are generated once and fanned out to every position
+        groups: Dict[bytes, List[int]] = {}
+        for i, request in enumerate(batch_request.requests):
+            key = hashlib.blake2b(request.model_dump_json().encode(), digest_size=16).digest()
+            groups.setdefault(key, []).append(i)
+
+        # Process unique requests concurrently, bounded by the shared semaphore
+        responses: List[Optional[GenerationResponse]] = [None] * len(batch_request.requests)
+
+        async with asyncio.TaskGroup() as task_group:
+            for indices in groups.values():
+                first = indices[0]
+                task_group.create_task(
+                    _guarded_generate(batch_request.requests[first], api_key, responses, first)
                 )
-            else:
-                responses.append(result)
+
+        for indices in groups.values():
+            result = responses[indices[0]]
+            for i in indices[1:]:
+                responses[i] = result.model_copy(update={"id": new_generation_id()})
 
         return responses
 
     except Exception as e:
-        logger.error(f"Batch generation failed: {str(e)}")
+        logger.error("Batch generation failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Batch generation failed: {str(e)}"
         )
 
 
-async def generate_code_async(request: GenerationRequest, api_key: str) -> GenerationResponse:
-    """Async helper for batch generation"""
-    generation_id = f"gen_{uuid.uuid4().hex[:8]}"
-    start_time = time.time()
-
+async def _guarded_generate(
+    request: GenerationRequest,
+    api_key: str,
+    responses: List[Optional[GenerationResponse]],
+    index: int
+) -> None:
+    """Runs one batch item under the generation semaphore and stores its result in place."""
     try:
-        # Initialize service with user's API key
-        generator_service = CodeGeneratorService(api_key=api_key)
-
-        # Generate code
-        code = await generator_service.generate_code(request)
+        async with generation_semaphore:
+            responses[index] = await generate_code_async(request, api_key)
+    except Exception as e:
+        logger.error("Batch generation %s failed: %s", index, e)
+        responses[index] = GenerationResponse.model_construct(
+            id=new_generation_id(),
+            status=GenerationStatus.FAILED,
+            language=request.programming_language.value,
+            error=str(e)
+        )
 
-        # Generate tests if requested
-        tests = None
-        if request.include_tests:
-            tests = await generator_service.generate_tests(code, request)
 
-        # Generate documentation if requested
-        documentation = None
-        if request.include_docs:
-            documentation = await generator_service.generate_documentation(code, request)
+async def generate_code_async(request: GenerationRequest, api_key: str) -> GenerationResponse:
+    """Async helper for batch generation"""
+    generation_id = new_generation_id()
+    start_ns = time.perf_counter_ns()
 
-        # Calculate metrics
-        metrics = await generator_service.calculate_metrics(code, request.programming_language.value)
+    try:
+        # Reuse the service cached for the user's API key
+        generator_service = get_generator_service(api_key)
 
-        processing_time = time.time() - start_time
+        # Generate code, tests, documentation and metrics
+        code, tests, documentation, metrics = await generate_all(generator_service, request)
 
-        return GenerationResponse(
+        return GenerationResponse.model_construct(
             id=generation_id,
             status=GenerationStatus.COMPLETED,
             code=code,
@@ -220,11 +414,11 @@ async def generate_code_async(request: GenerationRequest, api_key: str) -> Gener
             tests=tests,
             documentation=documentation,
             metrics=metrics,
-            processing_time=round(processing_time, 2)
+            processing_time=_elapsed_seconds(start_ns)
         )
 
     except Exception as e:
-        return GenerationResponse(
+        return GenerationResponse.model_construct(
             id=generation_id,
             status=GenerationStatus.FAILED,
             language=request.programming_language.value,
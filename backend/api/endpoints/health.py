@@ -1,64 +1,211 @@
 """
 @author Tom Butler
 @date 2025-10-23
-@description Health check endpoint for monitoring API status.
-             Returns operational status of API and external dependencies.
+@description Liveness and readiness checks for monitoring API status.
+             Liveness is a static body; readiness reports the status of external dependencies.
+             HealthCheckInterceptor serves both ahead of the FastAPI middleware stack; the
+             router below documents them in the OpenAPI schema and answers if the interceptor is absent.
 """
-from fastapi import APIRouter, status
-from datetime import datetime
+from typing import Awaitable, Dict, Optional, Tuple
+import asyncio
 import logging
+import time
+
+from fastapi import APIRouter, Response, status
+import orjson
+import redis.asyncio as redis
 
 from models import HealthResponse
+from models.response import utcnow
 from config import get_settings
+from ._fast_route import FastRoute
 
-router = APIRouter()
+# Parameterless routes skip dependency solving; see _fast_route.FastRoute
+router = APIRouter(route_class=FastRoute)
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+_JSON = "application/json"
+
+# Cached probe results: key -> (checked_at, ttl, response)
+_cache: Dict[str, Tuple[float, float, HealthResponse]] = {}
+_cache_lock = asyncio.Lock()
+_last_good: Optional[HealthResponse] = None
+
+# Liveness only proves the process is serving, so its body never changes
+_LIVE_BYTES = orjson.dumps({"status": "ok", "version": settings.app_version})
+
+
+async def render_liveness() -> Tuple[int, bytes]:
+    """Returns 200 and the precomputed liveness body without probing dependencies."""
+    return status.HTTP_200_OK, _LIVE_BYTES
+
+
+async def render_health() -> Tuple[int, bytes]:
+    """
+    Returns the readiness status code and JSON-encoded body.
+
+    Anything other than "healthy" (degraded, unhealthy or a stale fallback)
+    is 503, so probes that only look at the status code take the instance
+    out of rotation.
+    """
+    response = await get_health()
+    code = status.HTTP_200_OK if response.status == "healthy" else status.HTTP_503_SERVICE_UNAVAILABLE
+    return code, orjson.dumps(response.model_dump(mode="json"))
+
+
+@router.get(
+    "/health",
+    status_code=status.HTTP_200_OK,
+    responses={200: {"model": Dict[str, str]}}
+)
+async def liveness():
+    """Liveness probe: reports that the process is serving, without checking dependencies."""
+    code, body = await render_liveness()
+    return Response(content=body, status_code=code, media_type=_JSON)
+
 
-@router.get("/health", response_model=HealthResponse, status_code=status.HTTP_200_OK)
-async def health_check():
+@router.get(
+    "/health/ready",
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {"model": HealthResponse},
+        503: {"model": HealthResponse, "description": "A dependency is degraded or unavailable"}
+    }
+)
+async def readiness():
     """
-    Health check endpoint for monitoring and load balancers.
+    Readiness probe: reports the cached status of each external dependency.
 
     Returns:
-        HealthResponse with API status, version, timestamp, and service states
+        HealthResponse JSON with API status, version, timestamp, and service states;
+        503 unless every dependency is healthy
+    """
+    code, body = await render_health()
+    return Response(content=body, status_code=code, media_type=_JSON)
+
+
+def clear_health_cache() -> None:
+    """Forgets cached and last known good health results."""
+    global _last_good
+    _cache.clear()
+    _last_good = None
+
+
+async def get_health() -> HealthResponse:
     """
+    Returns a cached health check, re-probing dependencies when it expires.
+
+    The TTL adapts to probe cost: roughly twice the probe time plus a second,
+    clamped between health_cache_min_ttl and health_cache_max_ttl. Concurrent
+    callers share one probe run. If a probe run fails outright, the last good
+    result is returned with status "stale".
+
+    Returns:
+        HealthResponse from cache or a fresh health_check run
+    """
+    global _last_good
+
+    hit = _cache.get("health")
+    if hit and time.monotonic() - hit[0] < hit[1]:
+        return hit[2]
+
+    async with _cache_lock:
+        # Another request may have refreshed the cache while we waited
+        hit = _cache.get("health")
+        started = time.monotonic()
+        if hit and started - hit[0] < hit[1]:
+            return hit[2]
+
+        response = await health_check()
+        elapsed = time.monotonic() - started
+
+        if response.status == "unhealthy" and _last_good is not None:
+            return _last_good.model_copy(update={"status": "stale"})
+
+        if response.status != "unhealthy":
+            _last_good = response
+
+        ttl = min(max(elapsed * 2 + 1, settings.health_cache_min_ttl), settings.health_cache_max_ttl)
+        _cache["health"] = (started, ttl, response)
+        return response
+
+
+async def _check_openai() -> Tuple[str, str]:
+    # Users supply their own keys per request, so there is no server credential to test
+    return "openai", "connected"
+
+
+async def _check_redis() -> Tuple[str, str]:
+    client = redis.from_url(settings.redis_url)
     try:
-        services_status = {}
+        await client.ping()
+        return "redis", "connected"
+    finally:
+        await client.aclose()
+
+
+async def _check_tree_sitter() -> Tuple[str, str]:
+    return "tree_sitter", "operational"
 
-        # Check OpenAI connection
-        try:
-            # Could make a test call here
-            services_status["openai"] = "connected"
-        except:
-            services_status["openai"] = "disconnected"
 
-        # Check Redis if enabled
+async def _with_timeout(probe: Awaitable[Tuple[str, str]], timeout: float) -> Tuple[str, str]:
+    async with asyncio.timeout(timeout):
+        return await probe
+
+
+async def health_check() -> HealthResponse:
+    """
+    Health check for monitoring and load balancers.
+
+    Dependency probes run concurrently, each bounded by health_probe_timeout
+    and all together by health_check_timeout, so a hung dependency cannot
+    stall the endpoint. Failed probes report "disconnected" or "timeout".
+
+    Returns:
+        HealthResponse with API status, version, timestamp, and service states
+    """
+    try:
+        probes = [
+            ("openai", _check_openai()),
+            ("tree_sitter", _check_tree_sitter())
+        ]
         if settings.use_cache:
-            try:
-                # Would check Redis connection here
-                services_status["redis"] = "connected"
-            except:
-                services_status["redis"] = "disconnected"
-        else:
-            services_status["redis"] = "disabled"
-
-        # Check Tree-sitter
-        services_status["tree_sitter"] = "operational"
-
-        return HealthResponse(
-            status="healthy",
+            probes.append(("redis", _check_redis()))
+
+        async with asyncio.timeout(settings.health_check_timeout):
+            results = await asyncio.gather(
+                *(_with_timeout(probe, settings.health_probe_timeout) for _, probe in probes),
+                return_exceptions=True
+            )
+
+        services_status = {} if settings.use_cache else {"redis": "disabled"}
+        for (name, _), result in zip(probes, results):
+            if isinstance(result, TimeoutError):
+                services_status[name] = "timeout"
+            elif isinstance(result, BaseException):
+                logger.warning("Health probe %s failed: %s", name, result)
+                services_status[name] = "disconnected"
+            else:
+                services_status[name] = result[1]
+
+        healthy = all(
+            state in ("connected", "operational", "disabled")
+            for state in services_status.values()
+        )
+
+        return HealthResponse.model_construct(
+            status="healthy" if healthy else "degraded",
             version=settings.app_version,
-            timestamp=datetime.utcnow(),
+            timestamp=utcnow(),
             services=services_status
         )
 
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
-        return HealthResponse(
+        logger.error("Health check failed: %s", e)
+        return HealthResponse.model_construct(
             status="unhealthy",
             version=settings.app_version,
-            timestamp=datetime.utcnow(),
-            services={"error": str(e)}
-        )
\ No newline at end of file
+            timestamp=utcnow(),
+            services={"error": str(e) or type(e).__name__}
+        )
@@ -3,122 +3,122 @@
 @date 2025-10-23
 @description Language capabilities endpoint.
              Returns supported programming languages, natural languages, and test frameworks.
+             Payloads are static, so they are built and JSON-encoded once at import.
 """
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Response, status
+from types import MappingProxyType
+from typing import Mapping
 import logging
 
+import orjson
+
 from models import LanguagesResponse
 from config import get_settings
+from ._fast_route import FastRoute
 
-router = APIRouter()
+# Parameterless routes skip dependency solving; see _fast_route.FastRoute
+router = APIRouter(route_class=FastRoute)
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+_JSON = "application/json"
+
+# Programming languages with details
+PROGRAMMING_LANGUAGES = [
+    {"code": "python", "name": "Python", "version": "3.8+"},
+    {"code": "javascript", "name": "JavaScript", "version": "ES6+"},
+    {"code": "typescript", "name": "TypeScript", "version": "4.0+"},
+    {"code": "java", "name": "Java", "version": "11+"},
+    {"code": "csharp", "name": "C#", "version": ".NET 6+"},
+    {"code": "go", "name": "Go", "version": "1.16+"},
+    {"code": "rust", "name": "Rust", "version": "2021 Edition"},
+    {"code": "cpp", "name": "C++", "version": "C++17"},
+    {"code": "ruby", "name": "Ruby", "version": "3.0+"},
+    {"code": "swift", "name": "Swift", "version": "5.0+"}
+]
+
+# Natural languages
+NATURAL_LANGUAGES = [
+    {"code": "english", "name": "English"},
+    {"code": "spanish", "name": "Spanish"},
+    {"code": "french", "name": "French"},
+    {"code": "german", "name": "German"},
+    {"code": "chinese", "name": "Chinese (Simplified)"},
+    {"code": "japanese", "name": "Japanese"},
+    {"code": "portuguese", "name": "Portuguese"},
+    {"code": "italian", "name": "Italian"},
+    {"code": "russian", "name": "Russian"},
+    {"code": "arabic", "name": "Arabic"}
+]
+
+# Test frameworks by language
+TEST_FRAMEWORKS = {
+    "python": ["pytest", "unittest", "nose2", "doctest"],
+    "javascript": ["jest", "mocha", "jasmine", "vitest", "cypress"],
+    "typescript": ["jest", "mocha", "jasmine", "vitest", "cypress"],
+    "java": ["junit", "testng", "mockito", "assertj"],
+    "csharp": ["xunit", "nunit", "mstest"],
+    "go": ["testing", "testify", "ginkgo"],
+    "rust": ["cargo test", "proptest"],
+    "cpp": ["gtest", "catch2", "boost.test"],
+    "ruby": ["rspec", "minitest", "cucumber"],
+    "swift": ["xctest", "quick"]
+}
+
+# Validated once here; handlers return the encoded bytes without revalidation
+_LANGUAGES_BYTES = orjson.dumps(LanguagesResponse(
+    programming_languages=PROGRAMMING_LANGUAGES,
+    natural_languages=NATURAL_LANGUAGES,
+    test_frameworks=TEST_FRAMEWORKS
+).model_dump())
+_PROGRAMMING_BYTES = orjson.dumps(settings.programming_languages)
+_NATURAL_BYTES = orjson.dumps(settings.natural_languages)
+_FRAMEWORK_BYTES: Mapping[str, bytes] = MappingProxyType({
+    language: orjson.dumps(frameworks) for language, frameworks in TEST_FRAMEWORKS.items()
+})
+_EMPTY_LIST_BYTES = b"[]"
+
 
 @router.get(
     "/languages",
-    response_model=LanguagesResponse,
-    status_code=status.HTTP_200_OK
+    status_code=status.HTTP_200_OK,
+    responses={200: {"model": LanguagesResponse}}
 )
 async def get_supported_languages():
     """
     Returns all supported languages and test frameworks.
 
     Returns:
-        LanguagesResponse with programming languages, natural languages, and framework mappings
+        LanguagesResponse JSON with programming languages, natural languages, and framework mappings
     """
-    try:
-        # Programming languages with details
-        programming_languages = [
-            {"code": "python", "name": "Python", "version": "3.8+"},
-            {"code": "javascript", "name": "JavaScript", "version": "ES6+"},
-            {"code": "typescript", "name": "TypeScript", "version": "4.0+"},
-            {"code": "java", "name": "Java", "version": "11+"},
-            {"code": "csharp", "name": "C#", "version": ".NET 6+"},
-            {"code": "go", "name": "Go", "version": "1.16+"},
-            {"code": "rust", "name": "Rust", "version": "2021 Edition"},
-            {"code": "cpp", "name": "C++", "version": "C++17"},
-            {"code": "ruby", "name": "Ruby", "version": "3.0+"},
-            {"code": "swift", "name": "Swift", "version": "5.0+"}
-        ]
-
-        # Natural languages
-        natural_languages = [
-            {"code": "english", "name": "English"},
-            {"code": "spanish", "name": "Spanish"},
-            {"code": "french", "name": "French"},
-            {"code": "german", "name": "German"},
-            {"code": "chinese", "name": "Chinese (Simplified)"},
-            {"code": "japanese", "name": "Japanese"},
-            {"code": "portuguese", "name": "Portuguese"},
-            {"code": "italian", "name": "Italian"},
-            {"code": "russian", "name": "Russian"},
-            {"code": "arabic", "name": "Arabic"}
-        ]
-
-        # Test frameworks by language
-        test_frameworks = {
-            "python": ["pytest", "unittest", "nose2", "doctest"],
-            "javascript": ["jest", "mocha", "jasmine", "vitest", "cypress"],
-            "typescript": ["jest", "mocha", "jasmine", "vitest", "cypress"],
-            "java": ["junit", "testng", "mockito", "assertj"],
-            "csharp": ["xunit", "nunit", "mstest"],
-            "go": ["testing", "testify", "ginkgo"],
-            "rust": ["cargo test", "proptest"],
-            "cpp": ["gtest", "catch2", "boost.test"],
-            "ruby": ["rspec", "minitest", "cucumber"],
-            "swift": ["xctest", "quick"]
-        }
-
-        return LanguagesResponse(
-            programming_languages=programming_languages,
-            natural_languages=natural_languages,
-            test_frameworks=test_frameworks
-        )
-
-    except Exception as e:
-        logger.error(f"Failed to get languages: {str(e)}")
-        raise
+    return Response(content=_LANGUAGES_BYTES, media_type=_JSON)
 
 
 @router.get(
     "/languages/programming",
-    response_model=list,
-    status_code=status.HTTP_200_OK
+    status_code=status.HTTP_200_OK,
+    responses={200: {"model": list}}
 )
 async def get_programming_languages():
     """Get only supported programming languages"""
-    return settings.programming_languages
+    return Response(content=_PROGRAMMING_BYTES, media_type=_JSON)
 
 
 @router.get(
     "/languages/natural",
-    response_model=list,
-    status_code=status.HTTP_200_OK
+    status_code=status.HTTP_200_OK,
+    responses={200: {"model": list}}
 )
 async def get_natural_languages():
     """Get only supported natural languages"""
-    return settings.natural_languages
+    return Response(content=_NATURAL_BYTES, media_type=_JSON)
 
 
 @router.get(
     "/languages/{language}/frameworks",
-    response_model=list,
-    status_code=status.HTTP_200_OK
+    status_code=status.HTTP_200_OK,
+    responses={200: {"model": list}}
 )
 async def get_test_frameworks(language: str):
     """Get test frameworks for a specific language"""
-    frameworks = {
-        "python": ["pytest", "unittest", "nose2", "doctest"],
-        "javascript": ["jest", "mocha", "jasmine", "vitest", "cypress"],
-        "typescript": ["jest", "mocha", "jasmine", "vitest", "cypress"],
-        "java": ["junit", "testng", "mockito", "assertj"],
-        "csharp": ["xunit", "nunit", "mstest"],
-        "go": ["testing", "testify", "ginkgo"],
-        "rust": ["cargo test", "proptest"],
-        "cpp": ["gtest", "catch2", "boost.test"],
-        "ruby": ["rspec", "minitest", "cucumber"],
-        "swift": ["xctest", "quick"]
-    }
-
-    return frameworks.get(language, [])
\ No newline at end of file
+    return Response(content=_FRAMEWORK_BYTES.get(language, _EMPTY_LIST_BYTES), media_type=_JSON)
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""
+@author Tom Butler
+@date 2025-10-23
+@description Pure ASGI interceptor for health probes.
+             Answers health checks before the FastAPI middleware and routing stack runs.
+"""
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+
+from api.endpoints.health import render_health, render_liveness
+
+_JSON_HEADERS = [(b"content-type", b"application/json")]
+_ALLOWED_METHODS = ("GET", "HEAD")
+
+
+class HealthCheckInterceptor:
+    """
+    ASGI middleware that serves health check paths directly.
+
+    Each path maps to a coroutine function returning its status code and
+    JSON body, so the static liveness probe and the dependency-checking
+    readiness probe share one interceptor.
+
+    Load balancer and Kubernetes probes skip CORS, routing, dependency
+    resolution and response validation. All other traffic, including
+    lifespan events, is passed through to the wrapped application.
+
+    dependency_overrides and openapi() forward to a wrapped FastAPI app, so
+    the interceptor can stand in for it in tests and tooling.
+    """
+
+    def __init__(
+        self,
+        app,
+        routes: Optional[Mapping[str, Callable[[], Awaitable[Tuple[int, bytes]]]]] = None
+    ):
+        """
+        Args:
+            app: Wrapped ASGI application
+            routes: Exact request paths mapped to coroutine functions returning (status code, JSON body)
+        """
+        self.app = app
+        self.routes = dict(routes or {
+            "/api/health": render_liveness,
+            "/api/health/ready": render_health
+        })
+
+    @property
+    def dependency_overrides(self) -> Dict[Callable[..., Any], Callable[..., Any]]:
+        """The wrapped FastAPI app's dependency overrides."""
+        return self.app.dependency_overrides
+
+    def openapi(self) -> Dict[str, Any]:
+        """Returns the wrapped FastAPI app's OpenAPI schema."""
+        return self.app.openapi()
+
+    async def __call__(self, scope, receive, send):
+        render = self.routes.get(scope["path"]) if scope["type"] == "http" else None
+        if render is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] not in _ALLOWED_METHODS:
+            await send({
+                "type": "http.response.start",
+                "status": 405,
+                "headers": [(b"allow", b"GET, HEAD"), (b"content-length", b"0")]
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        status, body = await render()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": _JSON_HEADERS + [(b"content-length", str(len(body)).encode())]
+        })
+        await send({
+            "type": "http.response.body",
+            "body": body if scope["method"] == "GET" else b""
+        })
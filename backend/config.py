@@ -4,9 +4,13 @@
 @description Application configuration using Pydantic settings.
              Loads environment variables and provides typed access to config values.
 """
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
-from typing import List
-from functools import lru_cache
+from typing import Any, Tuple, Union
+
+# The str arm lets comma-separated env values reach split_comma_separated
+# instead of failing JSON decoding; the validator always yields a tuple
+StrTuple = Union[Tuple[str, ...], str]
 
 
 class Settings(BaseSettings):
@@ -25,21 +29,44 @@ class Settings(BaseSettings):
     api_port: int = 8000
     api_prefix: str = "/api"
 
+    # Uvicorn worker processes when run via main.py (0 uses one per CPU)
+    workers: int = 0
+
     # Users provide their own API key via Authorization header
     openai_api_key: str = ""
     openai_model: str = "gpt-4-turbo-preview"
     openai_temperature: float = 0.7
     openai_max_tokens: int = 4000
 
-    cors_origins: List[str] = []
+    cors_origins: StrTuple = ()
     cors_credentials: bool = True
-    cors_methods: List[str] = ["*"]
-    cors_headers: List[str] = ["*"]
+    cors_methods: StrTuple = ("*",)
+    cors_headers: StrTuple = ("*",)
 
     redis_url: str = "redis://localhost:6379/0"
     cache_ttl: int = 3600
     use_cache: bool = False
 
+    # In-process cache for repeated analysis of identical code (0 disables)
+    analysis_cache_size: int = 512
+    analysis_cache_ttl: int = 300
+
+    # Parsed syntax trees are kept in memory; an absolute directory also persists them across
+    # restarts. Entries are unpickled, so the directory must be writable only by the service user.
+    ast_cache_dir: str = ""
+    ast_cache_size: int = 256
+
+    # Seconds a per-API-key generator service (and its LLM client) is reused
+    generator_service_ttl: int = 300
+
+    # Seconds allowed per dependency probe and for the whole health check
+    health_probe_timeout: float = 2.0
+    health_check_timeout: float = 3.0
+
+    # Bounds in seconds for how long health check results are reused
+    health_cache_min_ttl: float = 5.0
+    health_cache_max_ttl: float = 30.0
+
     rate_limit_requests: int = 100
     rate_limit_period: int = 3600
 
@@ -47,7 +74,7 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     jwt_expiration_minutes: int = 10080
 
-    programming_languages: List[str] = [
+    programming_languages: StrTuple = (
         "python",
         "javascript",
         "typescript",
@@ -58,9 +85,9 @@ class Settings(BaseSettings):
         "cpp",
         "ruby",
         "swift"
-    ]
+    )
 
-    natural_languages: List[str] = [
+    natural_languages: StrTuple = (
         "english",
         "spanish",
         "french",
@@ -71,22 +98,40 @@ class Settings(BaseSettings):
         "italian",
         "russian",
         "arabic"
-    ]
+    )
 
     max_concurrent_generations: int = 3
     max_code_length: int = 10000
     max_prompt_length: int = 2000
 
+    @field_validator(
+        "cors_origins",
+        "cors_methods",
+        "cors_headers",
+        "programming_languages",
+        "natural_languages",
+        mode="before"
+    )
+    @classmethod
+    def split_comma_separated(cls, value: Any) -> Any:
+        """Accepts "a,b,c" as well as JSON arrays for list-valued settings."""
+        if isinstance(value, str):
+            return tuple(item.strip() for item in value.split(",") if item.strip())
+        return value
+
     class Config:
         env_file = ".env"
         case_sensitive = False
 
 
-@lru_cache()
+SETTINGS = Settings()
+
+
 def get_settings() -> Settings:
     """
-    Returns cached Settings instance.
+    Returns the Settings singleton.
 
-    Uses lru_cache to ensure single instance throughout application lifecycle.
+    Settings are loaded once at import, so this is a plain attribute read and
+    remains usable as a FastAPI dependency.
     """
-    return Settings()
\ No newline at end of file
+    return SETTINGS
@@ -4,13 +4,19 @@
 @description FastAPI application entry point for AI Code Generator.
              Configures CORS, logging, and routes for code generation endpoints.
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
+import orjson
+
 from config import get_settings
 from api.endpoints import generate, analyze, languages, health
+from api.health_interceptor import HealthCheckInterceptor
+from services import shutdown_process_pool
 
 logging.basicConfig(
     level=logging.INFO,
@@ -20,28 +26,45 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+_ROOT_BYTES = orjson.dumps({
+    "name": settings.app_name,
+    "version": settings.app_version,
+    "status": "operational",
+    "api_docs": f"{settings.api_prefix}/docs"
+})
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Application lifespan manager for startup and shutdown events.
 
-    Logs application configuration on startup and cleanup on shutdown.
+    Logs application configuration on startup, warms the analyzer and
+    OpenAPI schema, and stops the batch-analysis process pool on shutdown.
     """
     logger.info(f"Starting {settings.app_name} v{settings.app_version}")
     logger.info(f"Environment: {settings.environment}")
     logger.info(f"Debug mode: {settings.debug}")
 
+    # Build the analyzer and run each stage once (tree-sitter grammars, black's
+    # parser driver) before serving the first request
+    await asyncio.to_thread(analyze.get_analyzer_service().warmup)
+
+    # Generate the OpenAPI schema now rather than on the first docs request
+    app.openapi()
+
     yield
 
     logger.info("Shutting down application")
+    shutdown_process_pool()
 
 
-app = FastAPI(
+fastapi_app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     debug=settings.debug,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url=f"{settings.api_prefix}/docs",
     redoc_url=f"{settings.api_prefix}/redoc",
     openapi_url=f"{settings.api_prefix}/openapi.json"
@@ -49,7 +72,7 @@ app = FastAPI(
 
 # CORS configured to accept requests from frontend origin
 # Users provide their own OpenAI API key via Authorization header
-app.add_middleware(
+fastapi_app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=settings.cors_credentials,
@@ -57,29 +80,44 @@ app.add_middleware(
     allow_headers=settings.cors_headers,
 )
 
-app.include_router(health.router, prefix=settings.api_prefix, tags=["health"])
-app.include_router(generate.router, prefix=settings.api_prefix, tags=["generation"])
-app.include_router(analyze.router, prefix=settings.api_prefix, tags=["analysis"])
-app.include_router(languages.router, prefix=settings.api_prefix, tags=["languages"])
+fastapi_app.include_router(health.router, prefix=settings.api_prefix, tags=["health"])
+fastapi_app.include_router(generate.router, prefix=settings.api_prefix, tags=["generation"])
+fastapi_app.include_router(analyze.router, prefix=settings.api_prefix, tags=["analysis"])
+fastapi_app.include_router(languages.router, prefix=settings.api_prefix, tags=["languages"])
 
 
-@app.get("/")
+@fastapi_app.get("/")
 async def root():
     """Root endpoint returning API status and documentation URL."""
-    return {
-        "name": settings.app_name,
-        "version": settings.app_version,
-        "status": "operational",
-        "api_docs": f"{settings.api_prefix}/docs"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
+
+
+# Health probes are answered before CORS and routing; see api/health_interceptor.py.
+# The health router registered above keeps them in the OpenAPI schema.
+# Point Kubernetes livenessProbe at /health and readinessProbe at /health/ready
+app = HealthCheckInterceptor(fastapi_app, routes={
+    f"{settings.api_prefix}/health": health.render_liveness,
+    f"{settings.api_prefix}/health/ready": health.render_health
+})
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
+
+    # Reload runs a single supervised process, so it only applies to one-worker debug runs
+    workers = settings.workers or (1 if settings.debug else os.cpu_count() or 1)
+    reload = settings.debug and workers == 1
+    if settings.debug and not reload:
+        logger.warning("Debug reload disabled because %d workers are configured", workers)
+
     uvicorn.run(
         "main:app",
         host=settings.api_host,
         port=settings.api_port,
-        reload=settings.debug,
+        loop="uvloop",
+        http="httptools",
+        workers=workers,
+        reload=reload,
         log_level="info"
-    )
\ No newline at end of file
+    )
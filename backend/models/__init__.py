@@ -7,6 +7,7 @@
 from .request import (
     GenerationRequest,
     AnalysisRequest,
+    BatchAnalysisRequest,
     BatchGenerationRequest,
     ProgrammingLanguage,
     NaturalLanguage
@@ -27,6 +28,7 @@ from .response import (
 __all__ = [
     "GenerationRequest",
     "AnalysisRequest",
+    "BatchAnalysisRequest",
     "BatchGenerationRequest",
     "ProgrammingLanguage",
     "NaturalLanguage",
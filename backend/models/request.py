@@ -4,8 +4,8 @@
 @description Request models for code generation and analysis endpoints.
              Defines supported languages, validation rules, and request structures.
 """
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List, Literal
+from pydantic import BaseModel, Field, StringConstraints
+from typing import Annotated, Optional, List, Literal, Set
 from enum import Enum
 
 
@@ -37,13 +37,15 @@ class NaturalLanguage(str, Enum):
     ARABIC = "arabic"
 
 
+# Stripped and length-checked inside pydantic-core, no Python validator call
+PromptStr = Annotated[str, StringConstraints(strip_whitespace=True, min_length=10, max_length=2000)]
+
+
 class GenerationRequest(BaseModel):
     """Request model for code generation endpoint with validation rules."""
-    prompt: str = Field(
+    prompt: PromptStr = Field(
         ...,
-        min_length=1,
-        max_length=2000,
-        description="The prompt describing what code to generate"
+        description="The prompt describing what code to generate (at least 10 characters)"
     )
     programming_language: ProgrammingLanguage = Field(
         ...,
@@ -79,12 +81,6 @@ class GenerationRequest(BaseModel):
         description="Code complexity level"
     )
 
-    @validator("prompt")
-    def validate_prompt(cls, v):
-        if len(v.strip()) < 10:
-            raise ValueError("Prompt must be at least 10 characters long")
-        return v.strip()
-
     class Config:
         json_schema_extra = {
             "example": {
@@ -99,6 +95,16 @@ class GenerationRequest(BaseModel):
         }
 
 
+# Names of the CodeMetrics fields a caller can ask for individually
+MetricName = Literal[
+    "lines_of_code",
+    "cyclomatic_complexity",
+    "readability_score",
+    "estimated_execution_time",
+    "memory_complexity"
+]
+
+
 class AnalysisRequest(BaseModel):
     """Request model for code analysis endpoint with configurable checks."""
     code: str = Field(
@@ -127,6 +133,10 @@ class AnalysisRequest(BaseModel):
         default=False,
         description="Format the code according to language standards"
     )
+    metrics_subset: Optional[Set[MetricName]] = Field(
+        default=None,
+        description="Metrics to compute when check_complexity is set (all when omitted)"
+    )
 
     class Config:
         json_schema_extra = {
@@ -141,11 +151,38 @@ class AnalysisRequest(BaseModel):
         }
 
 
+class BatchAnalysisRequest(BaseModel):
+    """Request model for analysing several files in one call."""
+    requests: List[AnalysisRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=20,
+        description="List of analysis requests (max 20)"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "requests": [
+                    {
+                        "code": "def hello():\n    print('Hello, World!')",
+                        "language": "python"
+                    },
+                    {
+                        "code": "function hello() {\n  console.log('Hello, World!');\n}",
+                        "language": "javascript",
+                        "format_code": True
+                    }
+                ]
+            }
+        }
+
+
 class BatchGenerationRequest(BaseModel):
     requests: List[GenerationRequest] = Field(
         ...,
-        min_items=1,
-        max_items=3,
+        min_length=1,
+        max_length=3,
         description="List of generation requests (max 3)"
     )
 
@@ -1,7 +1,21 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
+import time
+
+_last_second = 0
+_last_datetime: Optional[datetime] = None
+
+
+def utcnow() -> datetime:
+    """Current UTC time at one-second resolution, reused within the same second."""
+    global _last_second, _last_datetime
+    second = int(time.time())
+    if second != _last_second or _last_datetime is None:
+        _last_datetime = datetime.fromtimestamp(second, tz=timezone.utc)
+        _last_second = second
+    return _last_datetime
 
 
 class GenerationStatus(str, Enum):
@@ -12,9 +26,11 @@ class GenerationStatus(str, Enum):
 
 
 class CodeMetrics(BaseModel):
-    lines_of_code: int = Field(description="Total lines of code")
-    cyclomatic_complexity: int = Field(description="Cyclomatic complexity score")
-    readability_score: float = Field(description="Code readability score (0-100)")
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    lines_of_code: Optional[int] = Field(default=None, description="Total lines of code")
+    cyclomatic_complexity: Optional[int] = Field(default=None, description="Cyclomatic complexity score")
+    readability_score: Optional[float] = Field(default=None, description="Code readability score (0-100)")
     estimated_execution_time: Optional[str] = Field(
         default=None,
         description="Estimated execution time complexity"
@@ -26,6 +42,8 @@ class CodeMetrics(BaseModel):
 
 
 class TestResult(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     test_code: str = Field(description="Generated test code")
     framework: str = Field(description="Test framework used")
     coverage_estimate: float = Field(description="Estimated test coverage percentage")
@@ -33,6 +51,8 @@ class TestResult(BaseModel):
 
 
 class Documentation(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     inline_comments: str = Field(description="Code with inline comments")
     readme: Optional[str] = Field(default=None, description="README documentation")
     api_docs: Optional[str] = Field(default=None, description="API documentation")
@@ -48,7 +68,7 @@ class GenerationResponse(BaseModel):
     documentation: Optional[Documentation] = Field(default=None, description="Generated documentation")
     metrics: Optional[CodeMetrics] = Field(default=None, description="Code quality metrics")
     error: Optional[str] = Field(default=None, description="Error message if failed")
-    created_at: datetime = Field(default_factory=datetime.utcnow, description="Creation timestamp")
+    created_at: datetime = Field(default_factory=utcnow, description="Creation timestamp")
     processing_time: Optional[float] = Field(default=None, description="Processing time in seconds")
 
     class Config:
@@ -145,13 +165,10 @@ class LanguagesResponse(BaseModel):
 
 
 class HealthResponse(BaseModel):
-    status: str = Field(description="Service status")
-    version: str = Field(description="API version")
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
-    services: Dict[str, str] = Field(description="Status of dependent services")
-
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+        json_schema_extra={
             "example": {
                 "status": "healthy",
                 "version": "1.0.0",
@@ -163,20 +180,29 @@ class HealthResponse(BaseModel):
                 }
             }
         }
+    )
 
+    status: str = Field(description="Service status")
+    version: str = Field(description="API version")
+    timestamp: datetime = Field(default_factory=utcnow)
+    services: Dict[str, str] = Field(description="Status of dependent services")
 
-class ErrorResponse(BaseModel):
-    error: str = Field(description="Error message")
-    detail: Optional[str] = Field(default=None, description="Detailed error information")
-    status_code: int = Field(description="HTTP status code")
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
 
-    class Config:
-        json_schema_extra = {
+class ErrorResponse(BaseModel):
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+        json_schema_extra={
             "example": {
                 "error": "Invalid request",
                 "detail": "The prompt field is required",
                 "status_code": 400,
                 "timestamp": "2024-01-13T10:00:00Z"
             }
-        }
\ No newline at end of file
+        }
+    )
+
+    error: str = Field(description="Error message")
+    detail: Optional[str] = Field(default=None, description="Detailed error information")
+    status_code: int = Field(description="HTTP status code")
+    timestamp: datetime = Field(default_factory=utcnow)
\ No newline at end of file
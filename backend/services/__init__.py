@@ -4,10 +4,20 @@
 @description Service layer for code generation and analysis.
              Centralised imports for business logic services.
 """
-from .code_generator import CodeGeneratorService
-from .code_analyzer import CodeAnalyzerService
+from .code_generator import CodeGeneratorService, CodeFenceExtractor
+from .code_analyzer import CodeAnalyzerService, GRAMMAR_VERSION, shutdown_process_pool
+from .cache import TTLCache, content_key
+from .lang_profiles import LangProfile, LANG_PROFILES, get_lang_profile
 
 __all__ = [
     "CodeGeneratorService",
-    "CodeAnalyzerService"
+    "CodeFenceExtractor",
+    "CodeAnalyzerService",
+    "GRAMMAR_VERSION",
+    "shutdown_process_pool",
+    "TTLCache",
+    "content_key",
+    "LangProfile",
+    "LANG_PROFILES",
+    "get_lang_profile"
 ]
\ No newline at end of file
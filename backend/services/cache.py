@@ -0,0 +1,84 @@
+"""
+@author Tom Butler
+@date 2025-10-23
+@description In-process caching helpers shared by the service and API layers.
+             Provides a bounded LRU cache with per-entry expiry and content-hash keys.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+def content_key(code: str, *parts: Any) -> str:
+    """
+    Builds a compact cache key from source code and any extra discriminators.
+
+    Args:
+        code: Source code to hash
+        parts: Additional values (language, flags) appended to the digest
+
+    Returns:
+        Hex digest of the code followed by the stringified parts
+    """
+    digest = hashlib.blake2b(code.encode(), digest_size=16).hexdigest()
+    if not parts:
+        return digest
+    return digest + ":" + ":".join(str(part) for part in parts)
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a fixed time-to-live.
+
+    A maxsize of 0 disables the cache so callers need no separate feature flag.
+    A ttl of None keeps entries until they are evicted by size.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the cached value for key, or default if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Stores value under key, evicting the least recently used entries."""
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Removes every entry from the cache."""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_MISSING = object()
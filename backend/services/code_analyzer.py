@@ -4,11 +4,25 @@
 @description Code analysis service using tree-sitter for syntax validation.
              Calculates complexity metrics and generates improvement suggestions.
 """
+import ast
+import asyncio
+import io
 import logging
-from typing import Dict, List, Any, Optional
+import multiprocessing
+import os
+import platform
+import queue
+import re
+import sys
+import tokenize
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from importlib import metadata
+from typing import AbstractSet, Dict, Iterator, List, Any, Optional, Tuple
 try:
     import tree_sitter_languages as tsl
-    from tree_sitter import Node
     TREE_SITTER_AVAILABLE = True
 except ImportError:
     TREE_SITTER_AVAILABLE = False
@@ -18,9 +32,194 @@ import black
 import autopep8
 
 from models import AnalysisRequest, CodeMetrics
+from .cache import TTLCache, content_key
+from .lang_profiles import get_lang_profile
 
 logger = logging.getLogger(__name__)
 
+_MAGIC_NUM_RE = re.compile(r"\b\d+\b")
+
+# Unindented lines containing a colon
+_INDENT_ISSUE_RE = re.compile(r"^(?=[^ \t\n])[^\n]*:", re.MULTILINE)
+_LOOP_KEYWORD_RE = re.compile(r"for|while")
+
+# Error-handling keywords and memory-allocating constructs, each matched in one C-level search
+_ERROR_HANDLING_RE = re.compile(r"try|except|catch|throw|rescue")
+_MEMORY_INDICATOR_RE = re.compile("|".join(re.escape(indicator) for indicator in (
+    "[]", "list(", "array", "new int[", "new Array",
+    "malloc", "vector", "HashMap", "Dictionary",
+    "Set(", "Map("
+)))
+
+# Any run of more than 100 characters without a newline is an over-long line
+_LONG_LINE_RE = re.compile(r"[^\n]{101}")
+
+# Loop node types across the supported tree-sitter grammars
+_LOOP_NODE_TYPES = frozenset({
+    "for_statement", "for_in_statement", "enhanced_for_statement", "for_each_statement",
+    "for_range_loop", "while_statement", "do_statement", "repeat_while_statement",
+    "for_expression", "while_expression", "loop_expression",
+    # Ruby's loop nodes share their names with the anonymous keyword tokens inside them
+    "for", "while", "until"
+})
+_PYTHON_LOOP_NODES = (ast.For, ast.AsyncFor, ast.While)
+_PYTHON_COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+# Decision points that increase cyclomatic complexity
+_DECISION_KEYWORDS = [
+    "if", "elif", "else", "for", "while", "except",
+    "case", "when", "catch", "switch", "&&", "||",
+    "?", "try", "rescue", "unless"
+]
+# A keyword counts when it follows whitespace or starts a line and is followed by a space
+_DECISION_RE = re.compile(
+    r"(?:^|(?<=[ \t]))(?:" + "|".join(re.escape(kw) for kw in _DECISION_KEYWORDS) + r")(?= )",
+    re.MULTILINE
+)
+# Python branching keywords as NAME tokens; other languages' keywords such as
+# switch or rescue are ordinary identifiers in Python
+_PYTHON_DECISION_KEYWORDS = frozenset({"if", "elif", "for", "while", "except", "case"})
+
+
+def _grammar_version() -> str:
+    """Identifies the parser producing syntax results, so upgrades invalidate cached trees."""
+    if TREE_SITTER_AVAILABLE:
+        try:
+            return "tsl-" + metadata.version("tree-sitter-languages")
+        except metadata.PackageNotFoundError:
+            return "tsl-unknown"
+    # The compile() fallback follows the interpreter's grammar
+    return "py-" + platform.python_version()
+
+
+GRAMMAR_VERSION = _grammar_version()
+
+# Cached syntax results hold FlatTree ASTs; bump the suffix if their layout changes
+SYNTAX_CACHE_VERSION = GRAMMAR_VERSION + ":flat2"
+
+
+class FlatTree:
+    """
+    Syntax tree stored as parallel arrays in preorder.
+
+    One entry per node instead of a nested dict per node keeps large trees
+    cheap to build, cache and pickle. Node types are interned strings and
+    positions live in compact unsigned int arrays. child_counts records the
+    number of direct children, which is enough to rebuild the nesting.
+    named flags named nodes, as opposed to anonymous tokens such as keywords.
+    """
+
+    __slots__ = ("types", "start_rows", "start_cols", "end_rows", "end_cols", "child_counts", "named")
+
+    def __init__(self):
+        self.types: List[str] = []
+        self.start_rows = array("I")
+        self.start_cols = array("I")
+        self.end_rows = array("I")
+        self.end_cols = array("I")
+        self.child_counts = array("I")
+        self.named = array("B")
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    @classmethod
+    def from_node(cls, root) -> "FlatTree":
+        """
+        Flattens a tree-sitter node and its non-extra descendants iteratively.
+
+        Args:
+            root: Tree-sitter root node
+
+        Returns:
+            FlatTree with one preorder entry per node
+        """
+        tree = cls()
+        stack = [root]
+
+        while stack:
+            node = stack.pop()
+            children = [child for child in node.children if not child.is_extra]
+
+            tree.types.append(sys.intern(node.type))
+            tree.start_rows.append(node.start_point[0])
+            tree.start_cols.append(node.start_point[1])
+            tree.end_rows.append(node.end_point[0])
+            tree.end_cols.append(node.end_point[1])
+            tree.child_counts.append(len(children))
+            tree.named.append(node.is_named)
+
+            # Reversed so the first child is popped, and recorded, next
+            stack.extend(reversed(children))
+
+        return tree
+
+    def max_nesting(self, node_types: frozenset) -> int:
+        """
+        Deepest nesting of named nodes whose type is in node_types.
+
+        Anonymous tokens are skipped, so the "for" keyword inside a for
+        loop does not count as a second loop.
+
+        Args:
+            node_types: Node type names to count, such as loop statements
+
+        Returns:
+            Largest number of such nodes on any root-to-leaf path
+        """
+        deepest = 0
+        # Open parents as [children still to visit, matching depth inside the parent]
+        open_parents: List[list] = []
+
+        for i, node_type in enumerate(self.types):
+            depth = open_parents[-1][1] if open_parents else 0
+            if open_parents:
+                open_parents[-1][0] -= 1
+                if open_parents[-1][0] == 0:
+                    open_parents.pop()
+
+            if node_type in node_types and self.named[i]:
+                depth += 1
+                deepest = max(deepest, depth)
+
+            if self.child_counts[i]:
+                open_parents.append([self.child_counts[i], depth])
+
+        return deepest
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Rebuilds the nested {type, start, end, children} form used by the API.
+
+        Returns:
+            Nested dictionary for the root node, or an empty dict for an empty tree
+        """
+        root: Dict[str, Any] = {}
+        # Open parents as [node dict, children still to attach]
+        open_parents: List[list] = []
+
+        for i, node_type in enumerate(self.types):
+            node = {
+                "type": node_type,
+                "start": {"line": self.start_rows[i], "column": self.start_cols[i]},
+                "end": {"line": self.end_rows[i], "column": self.end_cols[i]},
+                "children": []
+            }
+
+            if open_parents:
+                parent = open_parents[-1]
+                parent[0]["children"].append(node)
+                parent[1] -= 1
+                if parent[1] == 0:
+                    open_parents.pop()
+            else:
+                root = node
+
+            if self.child_counts[i]:
+                open_parents.append([node, self.child_counts[i]])
+
+        return root
+
 
 class CodeAnalyzerService:
     """
@@ -28,17 +227,34 @@ class CodeAnalyzerService:
 
     Uses tree-sitter for AST parsing and syntax validation.
     Falls back to Python compile() when tree-sitter unavailable.
+
+    Tree-sitter parsers are not thread-safe and analysis runs in worker
+    threads, so each language has a pool of parsers that are checked out
+    for the duration of a parse.
     """
 
-    def __init__(self):
-        self.parsers = {}
+    def __init__(self, syntax_cache=None):
+        """
+        Initialises parser pools and the optional syntax result cache.
+
+        Args:
+            syntax_cache: Object exposing get_or_parse(code, lang, parse, version) used to reuse parsed trees
+        """
+        self._ts_languages: Dict[str, str] = {}
+        self._parser_pools: Dict[str, queue.Queue] = {}
+        self._pool_size = os.cpu_count() or 1
+        self.syntax_cache = syntax_cache
+        self._black_mode = black.Mode()
+        # Formatting is deterministic and slow, so repeat submissions reuse the result
+        self._format_cache = TTLCache(maxsize=256)
         self._init_parsers()
 
     def _init_parsers(self):
         """
-        Initialises tree-sitter parsers for all supported languages.
+        Loads one tree-sitter parser per supported language into its pool.
 
-        Gracefully handles missing parsers and logs warnings.
+        Further parsers are created on demand when concurrent requests
+        exhaust a pool. Gracefully handles missing parsers and logs warnings.
         """
         if not TREE_SITTER_AVAILABLE:
             logger.warning("Tree-sitter not available, syntax parsing will be limited")
@@ -59,9 +275,59 @@ class CodeAnalyzerService:
 
         for lang, ts_lang in language_mappings.items():
             try:
-                self.parsers[lang] = tsl.get_parser(ts_lang)
+                parser = tsl.get_parser(ts_lang)
             except Exception as e:
                 logger.warning(f"Could not load parser for {lang}: {e}")
+                continue
+
+            self._ts_languages[lang] = ts_lang
+            self._parser_pools[lang] = queue.Queue(maxsize=self._pool_size)
+            self._parser_pools[lang].put_nowait(parser)
+
+    @contextmanager
+    def _acquire_parser(self, language: str) -> Iterator[Any]:
+        """
+        Checks out a parser for exclusive use by the calling thread.
+
+        Args:
+            language: Programming language identifier with a loaded parser
+
+        Yields:
+            Tree-sitter parser, returned to the pool afterwards
+        """
+        pool = self._parser_pools[language]
+        try:
+            parser = pool.get_nowait()
+        except queue.Empty:
+            parser = tsl.get_parser(self._ts_languages[language])
+
+        try:
+            yield parser
+        finally:
+            try:
+                pool.put_nowait(parser)
+            except queue.Full:
+                # Pool already holds enough idle parsers; let this one go
+                pass
+
+    def warmup(self) -> None:
+        """
+        Runs each analysis stage once on a tiny input to pay one-time costs up front.
+
+        Exercises every pooled tree-sitter parser, black's parser driver and
+        the tokenize/ast paths behind the metrics, so the first real request
+        does not absorb their lazy initialisation.
+        """
+        for language in self._parser_pools:
+            with self._acquire_parser(language) as parser:
+                parser.parse(b"")
+
+        self._calculate_metrics("for item in items:\n    pass\n", "python")
+
+        try:
+            black.format_str("x = 1\n", mode=self._black_mode)
+        except Exception as e:
+            logger.warning(f"Could not warm up black: {e}")
 
     def analyze_code(self, request: AnalysisRequest) -> Dict[str, Any]:
         """
@@ -89,21 +355,44 @@ class CodeAnalyzerService:
                 "formatted_code": None
             }
 
+            syntax_tree = None
+            # Shared line scan for metrics and suggestions, so the code is only walked once
+            scan = None
+            if request.check_complexity or request.suggest_improvements:
+                scan = self._scan_code(request.code, request.language.value, request.metrics_subset)
+
             if request.check_syntax:
-                syntax_result = self._check_syntax(request.code, request.language.value)
+                if self.syntax_cache is not None:
+                    syntax_result = self.syntax_cache.get_or_parse(
+                        request.code,
+                        request.language.value,
+                        self._check_syntax,
+                        version=SYNTAX_CACHE_VERSION
+                    )
+                else:
+                    syntax_result = self._check_syntax(request.code, request.language.value)
                 result["valid"] = syntax_result["valid"]
                 result["issues"].extend(syntax_result.get("issues", []))
-                result["ast_structure"] = syntax_result.get("ast")
+                # Nested dicts are only built here, at the API boundary
+                syntax_tree = syntax_result.get("ast")
+                result["ast_structure"] = syntax_tree.to_dict() if syntax_tree is not None else None
 
             if request.check_complexity:
-                metrics = self._calculate_metrics(request.code, request.language.value)
+                metrics = self._calculate_metrics(
+                    request.code,
+                    request.language.value,
+                    syntax_tree,
+                    scan,
+                    request.metrics_subset
+                )
                 result["metrics"] = metrics
 
             if request.suggest_improvements:
                 suggestions = self._generate_suggestions(
                     request.code,
                     request.language.value,
-                    result.get("metrics")
+                    result.get("metrics"),
+                    scan
                 )
                 result["suggestions"] = suggestions
 
@@ -117,6 +406,64 @@ class CodeAnalyzerService:
             logger.error(f"Code analysis failed: {str(e)}")
             raise
 
+    async def analyze_batch(self, requests: List[AnalysisRequest]) -> List[Dict[str, Any]]:
+        """
+        Analyses several files concurrently.
+
+        Batches that format code run in a process pool, since black holds the
+        GIL for the whole format; parse-and-metrics-only batches use the
+        default thread pool, where tree-sitter parsing releases the GIL.
+
+        Args:
+            requests: Analysis requests, one per file
+
+        Returns:
+            Analysis result dictionaries in the same order as requests
+        """
+        loop = asyncio.get_running_loop()
+
+        if any(request.format_code for request in requests):
+            executor, analyze = get_process_pool(), _analyze_one
+        else:
+            executor, analyze = None, self.analyze_code
+
+        try:
+            return await asyncio.gather(*(
+                loop.run_in_executor(executor, analyze, request) for request in requests
+            ))
+        except BrokenProcessPool:
+            # A dead worker breaks the whole pool; drop it so the next batch starts a fresh one
+            shutdown_process_pool()
+            raise
+
+    def validate_only(self, code: str, language: str) -> Tuple[bool, List[Dict[str, Any]]]:
+        """
+        Checks syntax without running the rest of the analysis pipeline.
+
+        Skips metrics, suggestions, formatting and AST dictionary conversion.
+        Uses tree-sitter when a parser is loaded, otherwise the same fallback
+        as _check_syntax.
+
+        Args:
+            code: Source code to validate
+            language: Programming language identifier
+
+        Returns:
+            Tuple of (valid flag, list of syntax issues)
+        """
+        if TREE_SITTER_AVAILABLE and language in self._parser_pools:
+            try:
+                with self._acquire_parser(language) as parser:
+                    tree = parser.parse(bytes(code, "utf8"))
+            except Exception as e:
+                return False, [{"type": "error", "message": f"Parse error: {str(e)}"}]
+
+            errors = self._find_syntax_errors(tree.root_node)
+            return not errors, errors
+
+        result = self._check_syntax(code, language)
+        return result["valid"], result["issues"]
+
     def _check_syntax(self, code: str, language: str) -> Dict[str, Any]:
         """
         Validates syntax using tree-sitter AST parsing.
@@ -129,7 +476,7 @@ class CodeAnalyzerService:
             language: Programming language identifier
 
         Returns:
-            Dictionary with valid flag, issues list, and AST structure
+            Dictionary with valid flag, issues list, and FlatTree AST
         """
         result = {"valid": True, "issues": [], "ast": None}
 
@@ -150,7 +497,7 @@ class CodeAnalyzerService:
                 result["valid"] = True
             return result
 
-        if language not in self.parsers:
+        if language not in self._parser_pools:
             result["issues"].append({
                 "type": "error",
                 "message": f"Parser not available for {language}"
@@ -158,8 +505,8 @@ class CodeAnalyzerService:
             return result
 
         try:
-            parser = self.parsers[language]
-            tree = parser.parse(bytes(code, "utf8"))
+            with self._acquire_parser(language) as parser:
+                tree = parser.parse(bytes(code, "utf8"))
             root = tree.root_node
 
             # Check for syntax errors
@@ -169,7 +516,7 @@ class CodeAnalyzerService:
                 result["issues"].extend(errors)
 
             # Get AST structure
-            result["ast"] = self._node_to_dict(root)
+            result["ast"] = FlatTree.from_node(root)
 
             return result
 
@@ -181,113 +528,192 @@ class CodeAnalyzerService:
             })
             return result
 
-    def _find_syntax_errors(self, node, errors: List[Dict] = None) -> List[Dict]:
-        """Recursively find syntax errors in the AST"""
-        if not TREE_SITTER_AVAILABLE:
-            return []
+    def _find_syntax_errors(self, node: Any) -> List[Dict[str, Any]]:
+        """
+        Finds ERROR and missing nodes in preorder with a tree cursor.
 
-        if errors is None:
-            errors = []
+        Walks iteratively, so deep trees cannot hit the recursion limit, and
+        skips any subtree whose has_error flag is clear. A valid file is
+        therefore checked with a single flag read on the root.
 
-        if node.type == "ERROR" or node.is_missing:
-            errors.append({
-                "type": "error",
-                "line": node.start_point[0] + 1,
-                "column": node.start_point[1],
-                "message": f"Syntax error at line {node.start_point[0] + 1}"
-            })
+        Args:
+            node: Tree-sitter node to search, usually the root
 
-        for child in node.children:
-            self._find_syntax_errors(child, errors)
+        Returns:
+            List of syntax error dictionaries with line and column
+        """
+        if not TREE_SITTER_AVAILABLE:
+            return []
 
-        return errors
+        errors: List[Dict[str, Any]] = []
+        cursor = node.walk()
+
+        while True:
+            current = cursor.node
+            if current.type == "ERROR" or current.is_missing:
+                line = current.start_point[0] + 1
+                errors.append({
+                    "type": "error",
+                    "line": line,
+                    "column": current.start_point[1],
+                    "message": f"Syntax error at line {line}"
+                })
+
+            if current.has_error and cursor.goto_first_child():
+                continue
+
+            # No children left to visit: climb until a sibling exists
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return errors
+
+    def _calculate_metrics(
+        self,
+        code: str,
+        language: str,
+        syntax_tree: Optional[FlatTree] = None,
+        scan: Optional[Dict[str, Any]] = None,
+        subset: Optional[AbstractSet[str]] = None
+    ) -> CodeMetrics:
+        """
+        Calculate code quality metrics, using the parsed tree for loop nesting when available.
 
-    def _node_to_dict(self, node) -> Dict[str, Any]:
-        """Convert Tree-sitter node to dictionary"""
-        if not TREE_SITTER_AVAILABLE:
-            return {}
+        Args:
+            code: Source code to measure
+            language: Programming language identifier
+            syntax_tree: FlatTree from the syntax check, if any
+            scan: Line scan from _scan_code, computed here when not given
+            subset: CodeMetrics field names to compute; None computes all
 
-        return {
-            "type": node.type,
-            "start": {"line": node.start_point[0], "column": node.start_point[1]},
-            "end": {"line": node.end_point[0], "column": node.end_point[1]},
-            "children": [self._node_to_dict(child) for child in node.children if not child.is_extra]
-        }
+        Returns:
+            CodeMetrics with skipped fields left as None
+        """
+        # One pass over the lines feeds every metric below
+        if scan is None:
+            scan = self._scan_code(code, language, subset)
 
-    def _calculate_metrics(self, code: str, language: str) -> CodeMetrics:
-        """Calculate code quality metrics"""
-        lines = code.split('\n')
+        metrics: Dict[str, Any] = {}
 
         # Lines of code (excluding empty lines and comments)
-        loc = self._count_lines_of_code(lines, language)
+        if subset is None or "lines_of_code" in subset:
+            metrics["lines_of_code"] = scan["loc"]
 
         # Cyclomatic complexity
-        complexity = self._calculate_cyclomatic_complexity(code, language)
+        if subset is None or "cyclomatic_complexity" in subset:
+            metrics["cyclomatic_complexity"] = self._calculate_cyclomatic_complexity(scan)
 
         # Readability score
-        readability = self._calculate_readability(lines)
+        if subset is None or "readability_score" in subset:
+            metrics["readability_score"] = self._calculate_readability(scan)
 
         # Complexity estimates
-        time_complexity = self._estimate_time_complexity(code)
-        memory_complexity = self._estimate_memory_complexity(code)
-
-        return CodeMetrics(
-            lines_of_code=loc,
-            cyclomatic_complexity=complexity,
-            readability_score=readability,
-            estimated_execution_time=time_complexity,
-            memory_complexity=memory_complexity
-        )
+        if subset is None or "estimated_execution_time" in subset:
+            loop_depth = self._loop_depth(code, language, syntax_tree)
+            metrics["estimated_execution_time"] = self._estimate_time_complexity(code, scan, loop_depth)
+
+        if subset is None or "memory_complexity" in subset:
+            metrics["memory_complexity"] = self._estimate_memory_complexity(code)
 
-    def _count_lines_of_code(self, lines: List[str], language: str) -> int:
-        """Count actual lines of code"""
-        comment_indicators = {
-            "python": ["#"],
-            "javascript": ["//", "/*", "*/"],
-            "typescript": ["//", "/*", "*/"],
-            "java": ["//", "/*", "*/"],
-            "csharp": ["//", "/*", "*/"],
-            "go": ["//", "/*", "*/"],
-            "rust": ["//", "/*", "*/"],
-            "cpp": ["//", "/*", "*/"],
-            "ruby": ["#"],
-            "swift": ["//", "/*", "*/"]
+        return CodeMetrics(**metrics)
+
+    def _scan_code(self, code: str, language: str, subset: Optional[AbstractSet[str]] = None) -> Dict[str, Any]:
+        """
+        Collects the per-line counters used by the metric reducers.
+
+        Every counter is computed by str methods or precompiled regexes over
+        the whole string, so the per-line work runs in C rather than in a
+        Python loop over split lines. Counters that only feed metrics outside
+        subset are skipped.
+
+        Args:
+            code: Source code to scan
+            language: Programming language identifier
+            subset: CodeMetrics field names that will be computed; None for all
+
+        Returns:
+            Dictionary of line counts, lengths, decision points and loop positions
+        """
+        line_count = code.count("\n") + 1
+
+        scan = {
+            "line_count": line_count,
+            # Every character except the newlines separating the lines
+            "total_length": len(code) - (line_count - 1),
+            "has_long_lines": _LONG_LINE_RE.search(code) is not None
         }
 
-        indicators = comment_indicators.get(language, ["//", "#"])
-        loc = 0
+        if subset is None or "lines_of_code" in subset:
+            # Lines with content whose first non-blank text is not a comment marker
+            scan["loc"] = len(get_lang_profile(language).code_line_re.findall(code))
 
-        for line in lines:
-            stripped = line.strip()
-            if stripped and not any(stripped.startswith(ind) for ind in indicators):
-                loc += 1
+        if subset is None or "readability_score" in subset:
+            scan["indent_issues"] = len(_INDENT_ISSUE_RE.findall(code))
 
-        return loc
+        if subset is None or "cyclomatic_complexity" in subset:
+            scan["decision_points"] = self._count_decision_points(code, language)
 
-    def _calculate_cyclomatic_complexity(self, code: str, language: str) -> int:
-        """Calculate cyclomatic complexity"""
-        # Decision points that increase complexity
-        decision_keywords = [
-            "if", "elif", "else", "for", "while", "except",
-            "case", "when", "catch", "switch", "&&", "||",
-            "?", "try", "rescue", "unless"
-        ]
+        if subset is None or "estimated_execution_time" in subset:
+            code_lower = code.lower()
+            scan["loop_keyword_count"] = code_lower.count("for") + code_lower.count("while")
+            scan["loop_indents"] = self._loop_line_indents(code)
+
+        return scan
 
-        complexity = 1  # Base complexity
+    def _loop_line_indents(self, code: str) -> List[int]:
+        """Indentation of each line mentioning for/while, visiting only those lines."""
+        indents = []
+        previous_start = -1
+
+        for match in _LOOP_KEYWORD_RE.finditer(code):
+            line_start = code.rfind("\n", 0, match.start()) + 1
+            if line_start == previous_start:
+                continue
+            previous_start = line_start
+
+            line_end = code.find("\n", line_start)
+            line = code[line_start:line_end] if line_end != -1 else code[line_start:]
+            indents.append(len(line) - len(line.lstrip()))
+
+        return indents
+
+    def _count_decision_points(self, code: str, language: str) -> int:
+        """
+        Counts branching keywords and operators in one pass over the code.
+
+        Python is tokenized so only real keyword tokens count, never words
+        inside strings or comments. Other languages, and Python that does
+        not tokenize, use a single regex scan.
+
+        Args:
+            code: Source code to scan
+            language: Programming language identifier
+
+        Returns:
+            Number of decision points found
+        """
+        if language == "python":
+            try:
+                return sum(
+                    1 for tok in tokenize.generate_tokens(io.StringIO(code).readline)
+                    if tok.type == tokenize.NAME and tok.string in _PYTHON_DECISION_KEYWORDS
+                )
+            except (tokenize.TokenError, IndentationError, SyntaxError):
+                pass
 
-        for keyword in decision_keywords:
-            # Simple keyword counting (could be improved with AST)
-            complexity += code.count(f" {keyword} ") + code.count(f"\n{keyword} ")
+        return sum(1 for _ in _DECISION_RE.finditer(code))
 
-        return complexity
+    def _calculate_cyclomatic_complexity(self, scan: Dict[str, Any]) -> int:
+        """Calculate cyclomatic complexity"""
+        # Base complexity plus one per decision point
+        return 1 + scan["decision_points"]
 
-    def _calculate_readability(self, lines: List[str]) -> float:
+    def _calculate_readability(self, scan: Dict[str, Any]) -> float:
         """Calculate code readability score"""
-        if not lines:
+        line_count = scan["line_count"]
+        if not line_count:
             return 100.0
 
-        total_length = sum(len(line) for line in lines)
-        avg_length = total_length / len(lines)
+        avg_length = scan["total_length"] / line_count
 
         # Factors affecting readability
         score = 100.0
@@ -297,55 +723,95 @@ class CodeAnalyzerService:
             score -= min(30, (avg_length - 80) * 0.5)
 
         # Penalize very short or very long functions
-        if len(lines) < 3:
+        if line_count < 3:
             score -= 10
-        elif len(lines) > 50:
-            score -= min(20, (len(lines) - 50) * 0.2)
+        elif line_count > 50:
+            score -= min(20, (line_count - 50) * 0.2)
 
         # Check for proper indentation (simple heuristic)
-        indent_issues = sum(1 for line in lines if line and line[0] not in ' \t' and ':' in line)
-        score -= min(20, indent_issues * 2)
+        score -= min(20, scan["indent_issues"] * 2)
 
         return max(0.0, min(100.0, score))
 
-    def _estimate_time_complexity(self, code: str) -> str:
-        """Estimate algorithmic time complexity"""
-        code_lower = code.lower()
+    def _loop_depth(self, code: str, language: str, syntax_tree: Optional[FlatTree]) -> Optional[int]:
+        """
+        Deepest loop nesting taken from a syntax tree.
+
+        Uses the tree-sitter FlatTree when one was parsed, and Python's own
+        ast module for Python code otherwise.
+
+        Args:
+            code: Source code being analysed
+            language: Programming language identifier
+            syntax_tree: FlatTree from the syntax check, if any
+
+        Returns:
+            Maximum loop depth, or None when no tree is available
+        """
+        if syntax_tree is not None and len(syntax_tree):
+            return syntax_tree.max_nesting(_LOOP_NODE_TYPES)
+
+        if language != "python":
+            return None
+
+        try:
+            root = ast.parse(code)
+        except (SyntaxError, ValueError):
+            return None
+
+        deepest = 0
+        stack = [(root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if isinstance(node, _PYTHON_LOOP_NODES):
+                depth += 1
+            elif isinstance(node, _PYTHON_COMPREHENSIONS):
+                # Each generator clause is a nested loop
+                depth += len(node.generators)
+            deepest = max(deepest, depth)
+            stack.extend((child, depth) for child in ast.iter_child_nodes(node))
+
+        return deepest
+
+    def _estimate_time_complexity(self, code: str, scan: Dict[str, Any], loop_depth: Optional[int] = None) -> str:
+        """Estimate algorithmic time complexity from loop nesting, or from keyword counts without a tree"""
+        if loop_depth is not None:
+            if loop_depth >= 3:
+                return "O(n³) or higher"
+            elif loop_depth == 2:
+                return "O(n²)"
+            elif loop_depth == 1:
+                return "O(n)"
+            return self._estimate_without_loops(code)
 
         # Check for nested loops
-        loop_keywords = ["for", "while"]
-        loop_count = sum(code_lower.count(kw) for kw in loop_keywords)
+        loop_count = scan["loop_keyword_count"]
 
         if loop_count >= 3:
             return "O(n³) or higher"
         elif loop_count == 2:
             # Check if loops are nested
-            lines = code.split('\n')
-            indent_levels = []
-            for line in lines:
-                if any(kw in line for kw in loop_keywords):
-                    indent_levels.append(len(line) - len(line.lstrip()))
-
+            indent_levels = scan["loop_indents"]
             if len(indent_levels) >= 2 and indent_levels[1] > indent_levels[0]:
                 return "O(n²)"
             else:
                 return "O(n)"
         elif loop_count == 1:
             return "O(n)"
-        elif "recursi" in code_lower or "return self." in code_lower:
+
+        return self._estimate_without_loops(code)
+
+    def _estimate_without_loops(self, code: str) -> str:
+        """Complexity class for code without loops, flagging likely recursion"""
+        code_lower = code.lower()
+        if "recursi" in code_lower or "return self." in code_lower:
             return "O(log n) to O(n) - recursive"
         else:
             return "O(1)"
 
     def _estimate_memory_complexity(self, code: str) -> str:
         """Estimate memory complexity"""
-        memory_indicators = [
-            "[]", "list(", "array", "new int[", "new Array",
-            "malloc", "vector", "HashMap", "Dictionary",
-            "Set(", "Map("
-        ]
-
-        if any(indicator in code for indicator in memory_indicators):
+        if _MEMORY_INDICATOR_RE.search(code):
             if "resize" in code or "append" in code or "push" in code:
                 return "O(n)"
             else:
@@ -353,8 +819,14 @@ class CodeAnalyzerService:
         else:
             return "O(1)"
 
-    def _generate_suggestions(self, code: str, language: str, metrics: Optional[CodeMetrics]) -> List[str]:
-        """Generate improvement suggestions"""
+    def _generate_suggestions(
+        self,
+        code: str,
+        language: str,
+        metrics: Optional[CodeMetrics],
+        scan: Optional[Dict[str, Any]] = None
+    ) -> List[str]:
+        """Generate improvement suggestions, reusing the line scan from the metrics when given"""
         suggestions = []
 
         # Check for missing docstrings/comments
@@ -366,37 +838,74 @@ class CodeAnalyzerService:
             suggestions.append("Consider adding type hints for better code clarity")
 
         # Check for error handling
-        error_keywords = ["try", "except", "catch", "throw", "rescue"]
-        if not any(kw in code for kw in error_keywords):
+        if _ERROR_HANDLING_RE.search(code) is None:
             suggestions.append("Consider adding error handling for robustness")
 
         # Check complexity
-        if metrics and metrics.cyclomatic_complexity > 10:
+        if metrics and metrics.cyclomatic_complexity is not None and metrics.cyclomatic_complexity > 10:
             suggestions.append("Consider refactoring to reduce complexity")
 
         # Check line length
-        lines = code.split('\n')
-        if any(len(line) > 100 for line in lines):
+        has_long_lines = scan["has_long_lines"] if scan is not None else _LONG_LINE_RE.search(code) is not None
+        if has_long_lines:
             suggestions.append("Some lines exceed 100 characters - consider breaking them up")
 
         # Check for magic numbers
-        import re
-        numbers = re.findall(r'\b\d+\b', code)
+        numbers = _MAGIC_NUM_RE.findall(code)
         if len(numbers) > 5:
             suggestions.append("Consider using named constants instead of magic numbers")
 
+        # Check for direct recursion (Python)
+        if language == "python" and "def " in code:
+            for name in self._find_recursive_functions(code):
+                suggestions.append(
+                    f"Function '{name}' uses recursion - consider memoization or an iterative "
+                    "version for performance and to stay within the recursion limit"
+                )
+
         return suggestions
 
+    def _find_recursive_functions(self, code: str) -> List[str]:
+        """
+        Names of Python functions that call themselves directly.
+
+        Args:
+            code: Python source code
+
+        Returns:
+            Function names in source order; empty if the code does not parse
+        """
+        try:
+            root = ast.parse(code)
+        except (SyntaxError, ValueError):
+            return []
+
+        recursive = []
+        for node in ast.walk(root):
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            if any(
+                isinstance(call, ast.Call) and isinstance(call.func, ast.Name) and call.func.id == node.name
+                for call in ast.walk(node)
+            ):
+                recursive.append(node.name)
+        return recursive
+
     def _format_code(self, code: str, language: str) -> str:
         """Format code according to language standards"""
         try:
             if language == "python":
-                # Try black first
-                try:
-                    return black.format_str(code, mode=black.Mode())
-                except:
-                    # Fallback to autopep8
-                    return autopep8.fix_code(code)
+                key = content_key(code, language)
+                formatted = self._format_cache.get(key)
+                if formatted is None:
+                    # Try black first
+                    try:
+                        formatted = black.format_str(code, mode=self._black_mode)
+                    except:
+                        # Fallback to autopep8
+                        formatted = autopep8.fix_code(code)
+                    self._format_cache.set(key, formatted)
+                return formatted
 
             # For other languages, return as-is for now
             # Could integrate prettier for JS/TS, rustfmt for Rust, etc.
@@ -404,4 +913,41 @@ class CodeAnalyzerService:
 
         except Exception as e:
             logger.warning(f"Could not format code: {e}")
-            return code
\ No newline at end of file
+            return code
+
+
+# Per-process analyzer used by batch workers, created on the first task in each process
+_worker_analyzer: Optional[CodeAnalyzerService] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _analyze_one(request: AnalysisRequest) -> Dict[str, Any]:
+    """Module-level (picklable) entry point for analysing one request in a pool worker."""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = CodeAnalyzerService()
+    return _worker_analyzer.analyze_code(request)
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Returns the shared batch-analysis process pool, starting it on first use.
+
+    Workers are spawned rather than forked so they never inherit the
+    server's threads or locks.
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Stops the batch-analysis process pool if it was started."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+        _process_pool = None
@@ -5,27 +5,237 @@
              Generates code, tests, and documentation based on natural language prompts.
 """
 import logging
-from typing import Optional, Dict, Any
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.chains import LLMChain
-from langchain.callbacks import AsyncIteratorCallbackHandler
-import asyncio
+from functools import cache
+from typing import TYPE_CHECKING, Optional, Dict, Any, AsyncIterator, Tuple
 import json
+import re
 
 from config import get_settings
 from models import GenerationRequest, TestResult, Documentation, CodeMetrics
+from .lang_profiles import get_lang_profile
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# First fenced block, with or without a language tag line
+_CODE_FENCE_RE = re.compile(r"```(?:\w*\n)?(.*?)```", re.DOTALL)
+_JSON_DECODER = json.JSONDecoder()
+
+
+_CODE_PROMPT = """You are an expert programmer. Generate high-quality, production-ready code based on the following requirements:
+
+User Prompt: {prompt}
+Programming Language: {language}
+Project Goals: {project_goals}
+Complexity Level: {complexity}
+Style Guide: {style_guide}
+
+Requirements:
+1. Code must be syntactically correct
+2. Follow best practices for {language}
+3. Include proper error handling
+4. Be efficient and optimised
+5. Be well-structured and maintainable
+
+Return ONLY the code, wrapped in triple backticks with the language identifier.
+Do not include any explanations or comments outside the code block."""
+
+_TEST_PROMPT = """Generate comprehensive unit tests for the following code:
+
+Code to test:
+```{language}
+{code}
+```
+
+Test Framework: {framework}
+Language: {language}
+
+Requirements:
+1. Cover all functions/methods
+2. Include edge cases
+3. Test error conditions
+4. Follow {framework} best practices
+5. Aim for high code coverage
+
+Return ONLY the test code, wrapped in triple backticks with the language identifier."""
+
+_DOCUMENTATION_PROMPT = """Generate comprehensive documentation for the following code:
+
+Code to document:
+```{language}
+{code}
+```
+
+Natural Language: {natural_language}
+
+Please provide:
+1. Code with inline comments explaining complex logic
+2. A README section describing what the code does
+3. API documentation if applicable
+4. 2-3 usage examples
+
+Format your response as JSON with the following structure:
+{{
+    "inline_comments": "code with comments",
+    "readme": "README content",
+    "api_docs": "API documentation or null",
+    "usage_examples": ["example1", "example2"]
+}}"""
+
+_BUNDLE_PROMPT = """You are an expert programmer. Generate high-quality, production-ready code based on the following requirements, together with its unit tests and documentation:
+
+User Prompt: {prompt}
+Programming Language: {language}
+Project Goals: {project_goals}
+Complexity Level: {complexity}
+Style Guide: {style_guide}
+Test Framework: {framework}
+Documentation Language: {natural_language}
+
+Requirements:
+1. Code must be syntactically correct
+2. Follow best practices for {language}
+3. Include proper error handling
+4. Tests must cover all functions, edge cases and error conditions using {framework}
+5. Documentation must include inline comments, a README section, API docs if applicable and 2-3 usage examples
+
+Format your response as JSON only, with the following structure:
+{{
+    "code": "the complete source code",
+    "tests": "the complete test code",
+    "documentation": {{
+        "inline_comments": "code with comments",
+        "readme": "README content",
+        "api_docs": "API documentation or null",
+        "usage_examples": ["example1", "example2"]
+    }}
+}}"""
+
+
+@cache
+def _prompt_templates() -> Dict[str, Any]:
+    """Parses the prompt templates once, on first use, and shares them between instances."""
+    from langchain.prompts import ChatPromptTemplate
+
+    return {
+        "code": ChatPromptTemplate.from_template(_CODE_PROMPT),
+        "test": ChatPromptTemplate.from_template(_TEST_PROMPT),
+        "documentation": ChatPromptTemplate.from_template(_DOCUMENTATION_PROMPT),
+        "bundle": ChatPromptTemplate.from_template(_BUNDLE_PROMPT)
+    }
+
+
+def create_llm_client(api_key: str) -> "ChatOpenAI":
+    """
+    Builds a ChatOpenAI client for an API key and the current model settings.
+
+    Clients are not cached here; each CodeGeneratorService holds its own, and
+    the API layer caches services per key with an expiry.
+
+    Args:
+        api_key: OpenAI API key
+
+    Returns:
+        ChatOpenAI client configured from settings
+    """
+    # Imported on first use so importing the service layer does not load langchain and openai
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        api_key=api_key,
+        model=settings.openai_model,
+        temperature=settings.openai_temperature,
+        max_tokens=settings.openai_max_tokens
+    )
+
+
+class CodeFenceExtractor:
+    """
+    Incrementally extracts the body of the first fenced code block from streamed text.
+
+    Text before the opening fence and its language tag is dropped. The body
+    is released as soon as it arrives, holding back only the few characters
+    that might start the closing fence. A response with no fence at all is
+    released by flush(), matching the whole-response fallback of
+    _extract_code_from_response.
+    """
+
+    _FENCE = "```"
+    _CLOSE = "\n```"
+
+    def __init__(self):
+        self._buffer = ""
+        self._state = "seek"
+
+    def feed(self, chunk: str) -> str:
+        """
+        Consumes the next streamed chunk.
+
+        Args:
+            chunk: Next fragment of the LLM response
+
+        Returns:
+            Code body text that is now safe to emit, possibly empty
+        """
+        if self._state == "done":
+            return ""
+
+        self._buffer += chunk
+
+        if self._state == "seek":
+            start = self._buffer.find(self._FENCE)
+            if start == -1:
+                return ""
+            # Wait for the end of the opening fence line and its language tag
+            newline = self._buffer.find("\n", start + len(self._FENCE))
+            if newline == -1:
+                return ""
+            self._buffer = self._buffer[newline + 1:]
+            self._state = "body"
+
+        end = self._buffer.find(self._CLOSE)
+        if end != -1:
+            body, self._buffer = self._buffer[:end], ""
+            self._state = "done"
+            return body
+
+        # Hold back a suffix that could be the start of the closing fence
+        hold = 0
+        for size in range(min(len(self._CLOSE) - 1, len(self._buffer)), 0, -1):
+            if self._CLOSE.startswith(self._buffer[-size:]):
+                hold = size
+                break
+
+        body = self._buffer[:len(self._buffer) - hold]
+        self._buffer = self._buffer[len(body):]
+        return body
+
+    def flush(self) -> str:
+        """
+        Releases any text still held once the stream has ended.
+
+        Returns:
+            Remaining body text, or the whole response if no fence was ever seen
+        """
+        if self._state == "done":
+            return ""
+
+        remaining, self._buffer = self._buffer, ""
+        self._state = "done"
+        return remaining
+
 
 class CodeGeneratorService:
     """
     Service for AI-powered code generation.
 
-    Creates separate LLM instance per request using user-provided API key.
+    Holds one LLM client for the user-provided API key; the API layer reuses
+    services per key and expires them after generator_service_ttl seconds.
     Generates code, unit tests, and documentation for multiple programming languages.
+    Prompt templates are parsed once, when the first instance is created, and shared by every instance.
     """
 
     def __init__(self, api_key: Optional[str] = None):
@@ -42,12 +252,13 @@ class CodeGeneratorService:
         if not effective_api_key:
             raise ValueError("OpenAI API key is required")
 
-        self.llm = ChatOpenAI(
-            api_key=effective_api_key,
-            model=settings.openai_model,
-            temperature=settings.openai_temperature,
-            max_tokens=settings.openai_max_tokens
-        )
+        self.llm = create_llm_client(effective_api_key)
+
+        templates = _prompt_templates()
+        self._code_template = templates["code"]
+        self._test_template = templates["test"]
+        self._documentation_template = templates["documentation"]
+        self._bundle_template = templates["bundle"]
 
     async def generate_code(self, request: GenerationRequest) -> str:
         """
@@ -63,28 +274,54 @@ class CodeGeneratorService:
             Exception: If LLM call fails
         """
         try:
-            prompt = self._create_code_prompt(request)
-
-            chain = LLMChain(
-                llm=self.llm,
-                prompt=ChatPromptTemplate.from_template(prompt)
-            )
-
-            response = await chain.ainvoke({
-                "prompt": request.prompt,
-                "language": request.programming_language.value,
-                "project_goals": request.project_goals or "General purpose",
-                "complexity": request.complexity_level,
-                "style_guide": request.style_guide or "Standard conventions"
-            })
+            messages = self._code_template.format_messages(**self._code_prompt_inputs(request))
+            response = await self.llm.ainvoke(messages)
 
-            code = self._extract_code_from_response(response["text"])
+            code = self._extract_code_from_response(response.content)
             return code
 
         except Exception as e:
             logger.error(f"Code generation failed: {str(e)}")
             raise
 
+    async def generate_code_stream(self, request: GenerationRequest) -> AsyncIterator[str]:
+        """
+        Streams raw completion text for a code generation request as it arrives.
+
+        Callers can feed the chunks through CodeFenceExtractor to emit only the
+        code body, and extract the final code block from the concatenated
+        chunks once the stream ends.
+
+        Args:
+            request: Generation request with prompt, language, and options
+
+        Yields:
+            Text fragments of the LLM response in order
+
+        Raises:
+            Exception: If LLM call fails
+        """
+        try:
+            messages = self._code_template.format_messages(**self._code_prompt_inputs(request))
+
+            async for chunk in self.llm.astream(messages):
+                if chunk.content:
+                    yield chunk.content
+
+        except Exception as e:
+            logger.error(f"Streaming code generation failed: {str(e)}")
+            raise
+
+    def _code_prompt_inputs(self, request: GenerationRequest) -> Dict[str, Any]:
+        """Template variables for the code generation prompt."""
+        return {
+            "prompt": request.prompt,
+            "language": request.programming_language.value,
+            "project_goals": request.project_goals or "General purpose",
+            "complexity": request.complexity_level,
+            "style_guide": request.style_guide or "Standard conventions"
+        }
+
     async def generate_tests(self, code: str, request: GenerationRequest) -> TestResult:
         """
         Generates unit tests for provided code.
@@ -104,27 +341,16 @@ class CodeGeneratorService:
                 request.programming_language.value
             )
 
-            prompt = self._create_test_prompt(code, request, framework)
-
-            chain = LLMChain(
-                llm=self.llm,
-                prompt=ChatPromptTemplate.from_template(prompt)
+            messages = self._test_template.format_messages(
+                code=code,
+                language=request.programming_language.value,
+                framework=framework
             )
+            response = await self.llm.ainvoke(messages)
 
-            response = await chain.ainvoke({
-                "code": code,
-                "language": request.programming_language.value,
-                "framework": framework
-            })
-
-            test_code = self._extract_code_from_response(response["text"])
+            test_code = self._extract_code_from_response(response.content)
 
-            return TestResult(
-                test_code=test_code,
-                framework=framework,
-                coverage_estimate=self._estimate_coverage(test_code),
-                test_count=self._count_tests(test_code, request.programming_language.value)
-            )
+            return self._build_test_result(test_code, framework, request.programming_language.value)
 
         except Exception as e:
             logger.error(f"Test generation failed: {str(e)}")
@@ -142,128 +368,115 @@ class CodeGeneratorService:
             Documentation with comments, README, API docs, and examples
         """
         try:
-            prompt = self._create_documentation_prompt(code, request)
-
-            chain = LLMChain(
-                llm=self.llm,
-                prompt=ChatPromptTemplate.from_template(prompt)
+            messages = self._documentation_template.format_messages(
+                code=code,
+                language=request.programming_language.value,
+                natural_language=request.natural_language.value
             )
+            response = await self.llm.ainvoke(messages)
 
-            response = await chain.ainvoke({
-                "code": code,
-                "language": request.programming_language.value,
-                "natural_language": request.natural_language.value
-            })
-
-            doc_data = self._parse_documentation_response(response["text"])
+            doc_data = self._parse_documentation_response(response.content)
 
-            return Documentation(
-                inline_comments=doc_data.get("inline_comments", code),
-                readme=doc_data.get("readme"),
-                api_docs=doc_data.get("api_docs"),
-                usage_examples=doc_data.get("usage_examples", [])
-            )
+            return self._build_documentation(doc_data, code)
 
         except Exception as e:
             logger.error(f"Documentation generation failed: {str(e)}")
             raise
 
-    def _create_code_prompt(self, request: GenerationRequest) -> str:
-        return """You are an expert programmer. Generate high-quality, production-ready code based on the following requirements:
-
-User Prompt: {prompt}
-Programming Language: {language}
-Project Goals: {project_goals}
-Complexity Level: {complexity}
-Style Guide: {style_guide}
+    async def generate_bundle(
+        self,
+        request: GenerationRequest
+    ) -> Optional[Tuple[str, TestResult, Documentation]]:
+        """
+        Generates code, tests and documentation with a single LLM call.
 
-Requirements:
-1. Code must be syntactically correct
-2. Follow best practices for {language}
-3. Include proper error handling
-4. Be efficient and optimised
-5. Be well-structured and maintainable
+        Replaces the code call followed by separate test and documentation
+        calls. Returns None when the response is not the expected JSON, so
+        the caller can fall back to generating the artifacts separately.
 
-Return ONLY the code, wrapped in triple backticks with the language identifier.
-Do not include any explanations or comments outside the code block."""
+        Args:
+            request: Generation request with prompt, language, and options
 
-    def _create_test_prompt(self, code: str, request: GenerationRequest, framework: str) -> str:
-        return """Generate comprehensive unit tests for the following code:
+        Returns:
+            Tuple of (code, tests, documentation), or None if the response could not be parsed
 
-Code to test:
-```{language}
-{code}
-```
+        Raises:
+            Exception: If LLM call fails
+        """
+        try:
+            language = request.programming_language.value
+            framework = request.test_framework or self._get_default_test_framework(language)
 
-Test Framework: {framework}
-Language: {language}
+            messages = self._bundle_template.format_messages(
+                **self._code_prompt_inputs(request),
+                framework=framework,
+                natural_language=request.natural_language.value
+            )
+            response = await self.llm.ainvoke(messages)
 
-Requirements:
-1. Cover all functions/methods
-2. Include edge cases
-3. Test error conditions
-4. Follow {framework} best practices
-5. Aim for high code coverage
+            bundle = self._parse_bundle_response(response.content)
+            if bundle is None:
+                return None
 
-Return ONLY the test code, wrapped in triple backticks with the language identifier."""
+            code = self._extract_code_from_response(bundle["code"])
+            test_code = self._extract_code_from_response(bundle["tests"])
 
-    def _create_documentation_prompt(self, code: str, request: GenerationRequest) -> str:
-        return """Generate comprehensive documentation for the following code:
+            return (
+                code,
+                self._build_test_result(test_code, framework, language),
+                self._build_documentation(bundle["documentation"], code)
+            )
 
-Code to document:
-```{language}
-{code}
-```
+        except Exception as e:
+            logger.error(f"Bundle generation failed: {str(e)}")
+            raise
 
-Natural Language: {natural_language}
+    def _build_test_result(self, test_code: str, framework: str, language: str) -> TestResult:
+        """Wraps generated test code with its framework and estimates."""
+        return TestResult(
+            test_code=test_code,
+            framework=framework,
+            coverage_estimate=self._estimate_coverage(test_code),
+            test_count=self._count_tests(test_code, language)
+        )
 
-Please provide:
-1. Code with inline comments explaining complex logic
-2. A README section describing what the code does
-3. API documentation if applicable
-4. 2-3 usage examples
+    def _build_documentation(self, doc_data: Dict[str, Any], code: str) -> Documentation:
+        """Builds Documentation from parsed LLM output, defaulting comments to the code."""
+        return Documentation(
+            inline_comments=doc_data.get("inline_comments", code),
+            readme=doc_data.get("readme"),
+            api_docs=doc_data.get("api_docs"),
+            usage_examples=doc_data.get("usage_examples", [])
+        )
 
-Format your response as JSON with the following structure:
-{{
-    "inline_comments": "code with comments",
-    "readme": "README content",
-    "api_docs": "API documentation or null",
-    "usage_examples": ["example1", "example2"]
-}}"""
+    def extract_code(self, response: str) -> str:
+        """Extracts the code block from a complete LLM response."""
+        return self._extract_code_from_response(response)
 
     def _extract_code_from_response(self, response: str) -> str:
         """Extract code from LLM response"""
-        import re
-
-        # Try to find code block with language identifier
-        pattern = r"```[\w]*\n(.*?)\n```"
-        match = re.search(pattern, response, re.DOTALL)
-
-        if match:
-            return match.group(1).strip()
-
-        # Try to find code block without language identifier
-        pattern = r"```(.*?)```"
-        match = re.search(pattern, response, re.DOTALL)
-
-        if match:
-            return match.group(1).strip()
+        match = _CODE_FENCE_RE.search(response)
 
         # Return the whole response if no code block found
-        return response.strip()
+        return match.group(1).strip() if match else response.strip()
+
+    def _extract_json_object(self, response: str) -> Optional[Dict[str, Any]]:
+        """Decode the first JSON object embedded in an LLM response, ignoring surrounding text"""
+        start = response.find("{")
+        while start != -1:
+            try:
+                obj, _ = _JSON_DECODER.raw_decode(response, start)
+                return obj
+            except ValueError:
+                # Braces in prose before the real object; try the next one
+                start = response.find("{", start + 1)
+        return None
 
     def _parse_documentation_response(self, response: str) -> Dict[str, Any]:
         """Parse documentation response from LLM"""
-        try:
-            # Try to parse as JSON
-            import re
-            json_pattern = r'\{.*\}'
-            match = re.search(json_pattern, response, re.DOTALL)
-
-            if match:
-                return json.loads(match.group(0))
-        except:
-            pass
+        documentation = self._extract_json_object(response)
+        if documentation is not None:
+            return documentation
 
         # Fallback: create basic structure
         return {
@@ -273,21 +486,23 @@ Format your response as JSON with the following structure:
             "usage_examples": []
         }
 
+    def _parse_bundle_response(self, response: str) -> Optional[Dict[str, Any]]:
+        """Parse combined code/tests/documentation JSON, or None if incomplete"""
+        bundle = self._extract_json_object(response)
+
+        if not (
+            isinstance(bundle, dict)
+            and isinstance(bundle.get("code"), str)
+            and isinstance(bundle.get("tests"), str)
+            and isinstance(bundle.get("documentation"), dict)
+        ):
+            return None
+
+        return bundle
+
     def _get_default_test_framework(self, language: str) -> str:
         """Get default test framework for a language"""
-        frameworks = {
-            "python": "pytest",
-            "javascript": "jest",
-            "typescript": "jest",
-            "java": "junit",
-            "csharp": "xunit",
-            "go": "testing",
-            "rust": "cargo test",
-            "cpp": "gtest",
-            "ruby": "rspec",
-            "swift": "xctest"
-        }
-        return frameworks.get(language, "unittest")
+        return get_lang_profile(language).test_framework
 
     def _estimate_coverage(self, test_code: str) -> float:
         """Estimate test coverage based on test code"""
@@ -306,28 +521,13 @@ Format your response as JSON with the following structure:
 
     def _count_tests(self, test_code: str, language: str) -> int:
         """Count number of test cases"""
-        patterns = {
-            "python": r"def test_|class Test",
-            "javascript": r"test\(|it\(|describe\(",
-            "typescript": r"test\(|it\(|describe\(",
-            "java": r"@Test|void test",
-            "csharp": r"\[Test\]|\[Fact\]",
-            "go": r"func Test",
-            "rust": r"#\[test\]",
-            "cpp": r"TEST\(|TEST_F\(",
-            "ruby": r"it |describe |context ",
-            "swift": r"func test"
-        }
-
-        import re
-        pattern = patterns.get(language, r"test")
-        matches = re.findall(pattern, test_code, re.IGNORECASE)
+        matches = get_lang_profile(language).test_pattern.findall(test_code)
         return len(matches) if matches else 1
 
     async def calculate_metrics(self, code: str, language: str) -> CodeMetrics:
         """Calculate code quality metrics"""
         lines = code.split('\n')
-        loc = len([l for l in lines if l.strip() and not l.strip().startswith('#')])
+        loc = sum(1 for line in lines if (stripped := line.strip()) and not stripped.startswith('#'))
 
         # Simple cyclomatic complexity estimation
         complexity_indicators = ['if ', 'elif ', 'else:', 'for ', 'while ', 'except:', 'case ']
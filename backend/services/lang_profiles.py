@@ -0,0 +1,72 @@
+"""
+@author Tom Butler
+@date 2025-10-23
+@description Per-language settings shared by the generator and analyzer services.
+             One lookup returns the comment syntax, default test framework and compiled patterns for a language.
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class LangProfile:
+    """
+    Static per-language settings with their regexes compiled once at import.
+
+    Attributes:
+        comment_prefixes: Markers that start a comment line
+        test_framework: Default test framework for generated tests
+        test_pattern: Matches one test case in generated test code
+        code_line_re: Matches each line that holds code rather than a comment
+    """
+    comment_prefixes: Tuple[str, ...]
+    test_framework: str
+    test_pattern: "re.Pattern[str]"
+    code_line_re: "re.Pattern[str]"
+
+
+def _code_line_re(comment_prefixes: Tuple[str, ...]) -> "re.Pattern[str]":
+    # Leading blanks (never crossing a newline), then a visible character that does not open a comment
+    comment = "|".join(re.escape(prefix) for prefix in comment_prefixes)
+    return re.compile(r"^[^\S\n]*+(?!" + comment + r")\S", re.MULTILINE)
+
+
+def _profile(comment_prefixes: Tuple[str, ...], test_framework: str, test_pattern: str) -> LangProfile:
+    return LangProfile(
+        comment_prefixes=comment_prefixes,
+        test_framework=test_framework,
+        test_pattern=re.compile(test_pattern, re.IGNORECASE),
+        code_line_re=_code_line_re(comment_prefixes)
+    )
+
+
+_C_COMMENTS = ("//", "/*", "*/")
+
+LANG_PROFILES: Dict[str, LangProfile] = {
+    "python": _profile(("#",), "pytest", r"def test_|class Test"),
+    "javascript": _profile(_C_COMMENTS, "jest", r"test\(|it\(|describe\("),
+    "typescript": _profile(_C_COMMENTS, "jest", r"test\(|it\(|describe\("),
+    "java": _profile(_C_COMMENTS, "junit", r"@Test|void test"),
+    "csharp": _profile(_C_COMMENTS, "xunit", r"\[Test\]|\[Fact\]"),
+    "go": _profile(_C_COMMENTS, "testing", r"func Test"),
+    "rust": _profile(_C_COMMENTS, "cargo test", r"#\[test\]"),
+    "cpp": _profile(_C_COMMENTS, "gtest", r"TEST\(|TEST_F\("),
+    "ruby": _profile(("#",), "rspec", r"it |describe |context "),
+    "swift": _profile(_C_COMMENTS, "xctest", r"func test")
+}
+
+DEFAULT_PROFILE = _profile(("//", "#"), "unittest", r"test")
+
+
+def get_lang_profile(language: str) -> LangProfile:
+    """
+    Returns the profile for a language, or the generic default for unknown ones.
+
+    Args:
+        language: Programming language identifier
+
+    Returns:
+        LangProfile for the language
+    """
+    return LANG_PROFILES.get(language, DEFAULT_PROFILE)
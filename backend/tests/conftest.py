@@ -7,9 +7,9 @@
 import os
 import sys
 import pytest
-from unittest.mock import Mock, patch, AsyncMock
-from typing import Generator
-import asyncio
+from unittest.mock import create_autospec
+from types import MappingProxyType, SimpleNamespace
+from typing import Any, AsyncGenerator, Dict, Generator
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -17,29 +17,61 @@ os.environ["OPENAI_API_KEY"] = "test-api-key"
 os.environ["DEBUG"] = "True"
 os.environ["ENVIRONMENT"] = "testing"
 
+import httpx
 from fastapi.testclient import TestClient
 from main import app
+from test_fixtures import json_fast
 
 
 @pytest.fixture(scope="session")
-def event_loop():
-    """Creates event loop instance for async test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
-
-
-@pytest.fixture
 def test_client() -> Generator:
-    """Create a test client for the FastAPI app."""
+    """Test client shared by the whole session, so app startup (lifespan, warm-up) runs once."""
     with TestClient(app) as client:
         yield client
 
 
+@pytest.fixture(scope="session")
+def _api_responses(test_client: TestClient) -> MappingProxyType:
+    """Responses from the deterministic read-only endpoints, fetched once per session."""
+    return MappingProxyType({
+        "health": test_client.get("/api/health"),
+        "ready": test_client.get("/api/health/ready"),
+        "root": test_client.get("/"),
+        "languages": test_client.get("/api/languages")
+    })
+
+
+@pytest.fixture(scope="session")
+def api_snapshots(_api_responses) -> MappingProxyType:
+    """Parsed JSON bodies of the read-only endpoints, keyed like _api_responses."""
+    return MappingProxyType({name: json_fast(response) for name, response in _api_responses.items()})
+
+
+@pytest.fixture(scope="session")
+def api_status_codes(_api_responses) -> MappingProxyType:
+    """Status codes of the read-only endpoints, keyed like _api_responses."""
+    return MappingProxyType({name: response.status_code for name, response in _api_responses.items()})
+
+
+@pytest.fixture(scope="session")
+def languages_by_value(api_snapshots) -> MappingProxyType:
+    """Programming language entries from the /api/languages snapshot, keyed by their code."""
+    languages = api_snapshots["languages"]["programming_languages"]
+    return MappingProxyType({language["code"]: language for language in languages})
+
+
 @pytest.fixture
+async def async_client() -> AsyncGenerator:
+    """In-process async client that calls the app directly, without TestClient's thread portal."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
 def mock_openai_response():
     """Mock OpenAI API response for consistent testing."""
-    return {
+    return MappingProxyType({
         "choices": [{
             "message": {
                 "content": """def hello_world():
@@ -48,13 +80,13 @@ def mock_openai_response():
 """
             }
         }]
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_openai_test_response():
     """Mock OpenAI API response for test generation."""
-    return {
+    return MappingProxyType({
         "choices": [{
             "message": {
                 "content": """import unittest
@@ -66,13 +98,13 @@ class TestHelloWorld(unittest.TestCase):
 """
             }
         }]
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_openai_docs_response():
     """Mock OpenAI API response for documentation generation."""
-    return {
+    return MappingProxyType({
         "choices": [{
             "message": {
                 "content": """# Hello World Function
@@ -91,46 +123,76 @@ print(result)  # Output: Hello, World!
 """
             }
         }]
-    }
+    })
 
 
-@pytest.fixture
-def sample_generation_request():
-    """Sample request payload for code generation."""
-    return {
+@pytest.fixture(scope="session")
+def make_generation_request():
+    """Factory for code generation request payloads; keyword overrides replace the sample values."""
+    base = MappingProxyType({
         "prompt": "Create a hello world function",
         "programming_language": "python",
-        "complexity_level": "beginner",
+        "complexity_level": "simple",
         "include_tests": True,
-        "include_documentation": True,
+        "include_docs": True,
         "project_goals": "Learning basics",
         "style_guide": "PEP8",
         "natural_language": "english"
-    }
+    })
 
+    def make(**overrides) -> Dict[str, Any]:
+        return {**base, **overrides}
 
-@pytest.fixture
+    return make
+
+
+@pytest.fixture(scope="session")
 def sample_analyze_request():
     """Sample request payload for code analysis."""
-    return {
+    return MappingProxyType({
         "code": """def hello_world():
     return "Hello, World!"
 """,
         "language": "python"
-    }
+    })
+
+
+@pytest.fixture(scope="session")
+def _chat_openai_template():
+    """Autospecced ChatOpenAI class, built once per session."""
+    from langchain_openai import ChatOpenAI
+    return create_autospec(ChatOpenAI, instance=False)
 
 
 @pytest.fixture
-def mock_langchain_chain():
-    """Mock LangChain chain for testing."""
-    mock_chain = AsyncMock()
-    mock_chain.ainvoke.return_value = {
-        "text": """def hello_world():
-    '''A simple hello world function'''
-    return "Hello, World!"
-"""
-    }
-    return mock_chain
+def mock_chat_openai(_chat_openai_template, monkeypatch):
+    """
+    Patches langchain_openai.ChatOpenAI, which create_llm_client imports on use, with the shared autospec.
+
+    Copies of a mock share their child mocks, so the one template is reused
+    and reset after each test instead.
+    """
+    monkeypatch.setattr("langchain_openai.ChatOpenAI", _chat_openai_template)
+    yield _chat_openai_template
+    _chat_openai_template.reset_mock(return_value=True, side_effect=True)
+
+
+@pytest.fixture(scope="session")
+def _llm_message_cache() -> Dict[str, SimpleNamespace]:
+    """LLM message doubles keyed by their content, shared across the session."""
+    return {}
+
+
+@pytest.fixture(scope="session")
+def llm_message(_llm_message_cache):
+    """Factory returning a cached LLM message double (a plain namespace with .content) for the given text."""
+    def make(content: str) -> SimpleNamespace:
+        message = _llm_message_cache.get(content)
+        if message is None:
+            message = _llm_message_cache[content] = SimpleNamespace(content=content)
+        return message
+
+    return make
 
 
 @pytest.fixture(autouse=True)
@@ -140,4 +202,22 @@ def mock_env_vars(monkeypatch):
     monkeypatch.setenv("DEBUG", "True")
     monkeypatch.setenv("ENVIRONMENT", "testing")
     monkeypatch.setenv("API_HOST", "0.0.0.0")
-    monkeypatch.setenv("API_PORT", "8000")
\ No newline at end of file
+    monkeypatch.setenv("API_PORT", "8000")
+
+@pytest.fixture(autouse=True)
+def reset_generator_services():
+    """Drop cached generator services, and the LLM clients they hold, so each test sees its own ChatOpenAI patch."""
+    from api.endpoints import generate
+
+    yield
+    generate.generator_services.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_health_cache():
+    """Drop cached health results so each test observes its own probe outcome."""
+    from api.endpoints import health
+
+    health.clear_health_cache()
+    yield
+    health.clear_health_cache()
@@ -1,7 +1,54 @@
 """Integration tests for code analysis endpoint."""
+import re
 import pytest
-from unittest.mock import patch, Mock
+from unittest.mock import patch
 from fastapi.testclient import TestClient
+from types import SimpleNamespace
+from typing import Final
+
+from test_fixtures import json_fast
+
+_COMPLEX_PYTHON_CODE: Final[str] = """
+def complex_function(x, y, z):
+    if x > 0:
+        if y > 0:
+            if z > 0:
+                return x + y + z
+            else:
+                return x + y
+        else:
+            if z > 0:
+                return x + z
+            else:
+                return x
+    else:
+        if y > 0:
+            if z > 0:
+                return y + z
+            else:
+                return y
+        else:
+            if z > 0:
+                return z
+            else:
+                return 0
+"""
+
+_JS_HELLO_CODE: Final[str] = """
+function helloWorld() {
+    console.log("Hello, World!");
+    return true;
+}
+"""
+
+_FIBONACCI_CODE: Final[str] = """
+def fibonacci(n):
+    if n <= 1:
+        return n
+    return fibonacci(n-1) + fibonacci(n-2)
+"""
+
+_RECURSION_OR_PERFORMANCE_RE = re.compile(r"recursion|performance", re.IGNORECASE)
 
 
 @pytest.mark.integration
@@ -15,10 +62,10 @@ class TestAnalyzeEndpoint:
         sample_analyze_request
     ):
         """Test analyzing valid Python code."""
-        response = test_client.post("/api/analyze", json=sample_analyze_request)
+        response = test_client.post("/api/analyze", json=dict(sample_analyze_request))
 
         assert response.status_code == 200
-        data = response.json()
+        data = json_fast(response)
 
         assert "syntax_valid" in data
         assert "complexity" in data
@@ -36,7 +83,7 @@ class TestAnalyzeEndpoint:
         response = test_client.post("/api/analyze", json=request)
 
         assert response.status_code == 200
-        data = response.json()
+        data = json_fast(response)
 
         assert data["syntax_valid"] is False
         assert "syntax_errors" in data
@@ -44,83 +91,281 @@ class TestAnalyzeEndpoint:
 
     def test_analyze_complex_code(self, test_client: TestClient):
         """Test analyzing complex code with high cyclomatic complexity."""
-        complex_code = """
-def complex_function(x, y, z):
-    if x > 0:
-        if y > 0:
-            if z > 0:
-                return x + y + z
-            else:
-                return x + y
-        else:
-            if z > 0:
-                return x + z
-            else:
-                return x
-    else:
-        if y > 0:
-            if z > 0:
-                return y + z
-            else:
-                return y
-        else:
-            if z > 0:
-                return z
-            else:
-                return 0
-"""
-
         request = {
-            "code": complex_code,
+            "code": _COMPLEX_PYTHON_CODE,
             "language": "python"
         }
 
         response = test_client.post("/api/analyze", json=request)
 
         assert response.status_code == 200
-        data = response.json()
+        data = json_fast(response)
 
         assert data["syntax_valid"] is True
         assert data["complexity"] > 5  # High complexity
         assert len(data["suggestions"]) > 0
 
-    def test_analyze_empty_code(self, test_client: TestClient):
-        """Test analyzing empty code."""
+    def test_analyze_ignores_keywords_in_strings(self, test_client: TestClient):
+        """Test that Python keywords inside strings and comments add no complexity."""
         request = {
-            "code": "",
+            "code": 'message = "retry if it fails or else try again"  # for while\n',
             "language": "python"
         }
 
         response = test_client.post("/api/analyze", json=request)
 
         assert response.status_code == 200
-        data = response.json()
+        assert json_fast(response)["complexity"] == 1
 
-        assert data["syntax_valid"] is True
-        assert data["complexity"] == 1
-        assert data["lines_of_code"] == 0
+    def test_analyze_batch_preserves_order(self, test_client: TestClient):
+        """Test that batch analysis returns one result per file, in request order."""
+        request = {
+            "requests": [
+                {"code": "def add(a, b):\n    return a + b\n", "language": "python"},
+                {"code": "function add(a, b) {\n  return a + b;\n}", "language": "javascript"}
+            ]
+        }
+
+        response = test_client.post("/api/analyze/batch", json=request)
+
+        assert response.status_code == 200
+        data = json_fast(response)
+        assert [item["language"] for item in data] == ["python", "javascript"]
+        assert all(item["syntax_valid"] for item in data)
+
+    def test_analyze_batch_formats_in_process_pool(self):
+        """Test that formatting batches run in spawned workers and lifespan shutdown stops them."""
+        from main import app
+        from services import code_analyzer
+
+        request = {
+            "requests": [
+                {"code": "x=[1,2 ,3]\n", "language": "python", "format_code": True},
+                {"code": "def  f( a ):\n  return a\n", "language": "python", "format_code": True}
+            ]
+        }
+
+        with TestClient(app) as client:
+            response = client.post("/api/analyze/batch", json=request)
+            workers = list(code_analyzer._process_pool._processes.values())
+
+        assert response.status_code == 200
+        data = json_fast(response)
+        assert [item["formatted_code"] for item in data] == ["x = [1, 2, 3]\n", "def f(a):\n    return a\n"]
+        assert workers
+        assert code_analyzer._process_pool is None
+        assert not any(worker.is_alive() for worker in workers)
+
+    def test_analyze_metrics_subset(self, test_client: TestClient):
+        """Test that only the requested metrics are computed."""
+        request = {
+            "code": "def check(x):\n    if x:\n        return 1\n    return 0\n",
+            "language": "python",
+            "metrics_subset": ["cyclomatic_complexity"]
+        }
+
+        response = test_client.post("/api/analyze", json=request)
+
+        assert response.status_code == 200
+        data = json_fast(response)
+        assert data["complexity"] == 2
+        assert data["metrics"]["cyclomatic_complexity"] == 2
+        assert data["metrics"]["lines_of_code"] is None
+        assert data["metrics"]["estimated_execution_time"] is None
+
+    def test_analyze_sequential_loops_are_linear(self, test_client: TestClient):
+        """Test that loop nesting, not the number of loops, sets time complexity."""
+        request = {
+            "code": "for a in items:\n    print(a)\nfor b in items:\n    print(b)\n",
+            "language": "python"
+        }
+
+        response = test_client.post("/api/analyze", json=request)
+
+        assert response.status_code == 200
+        assert json_fast(response)["metrics"]["estimated_execution_time"] == "O(n)"
+
+    @pytest.mark.parametrize("language,code,expected", [
+        ("python", "for a in items:\n    print(a)\n", "O(n)"),
+        ("javascript", "for (const a of items) {\n    console.log(a);\n}\n", "O(n)"),
+        ("ruby", "while running do\n  step\nend\n", "O(n)"),
+        ("javascript", "for (const a of xs) {\n    for (const b of ys) {\n        f(a, b);\n    }\n}\n", "O(n²)")
+    ], ids=["python-for", "javascript-for-of", "ruby-while", "javascript-nested"])
+    def test_analyze_loop_depth_from_tree_sitter(self, language, code, expected):
+        """Test that loop keyword tokens in the tree-sitter AST do not count as extra loops."""
+        pytest.importorskip("tree_sitter_languages")
+        from services import CodeAnalyzerService
+        from models import AnalysisRequest
+
+        result = CodeAnalyzerService().analyze_code(AnalysisRequest(code=code, language=language))
+
+        assert result["valid"] is True
+        assert result["metrics"].estimated_execution_time == expected
+
+    def test_analyzer_dependency_override(self, test_client: TestClient):
+        """Test that dependency overrides set on main.app reach the wrapped FastAPI app."""
+        from main import app
+        from api.endpoints.analyze import get_analyzer_service
+
+        calls = []
+
+        def validate_only(code, language):
+            calls.append((code, language))
+            return False, ["stub issue"]
+
+        stub = SimpleNamespace(validate_only=validate_only)
+        app.dependency_overrides[get_analyzer_service] = lambda: stub
+        try:
+            response = test_client.post("/api/analyze/validate", json={"code": "x = 1", "language": "python"})
+        finally:
+            app.dependency_overrides.clear()
+
+        assert json_fast(response)["issues"] == ["stub issue"]
+        assert calls == [("x = 1", "python")]
+
+    def test_analyze_boolean_operators_do_not_add_complexity(self, test_client: TestClient):
+        """Test that Python and/or keep the score the regex scan gave before tokenizing."""
+        plain = test_client.post("/api/analyze", json={"code": "if a:\n    pass\n", "language": "python"})
+        combined = test_client.post(
+            "/api/analyze",
+            json={"code": "if a and b or c:\n    pass\n", "language": "python"}
+        )
+
+        assert json_fast(combined)["complexity"] == json_fast(plain)["complexity"]
+
+    def test_python_decision_points_ignore_other_languages_keywords(self):
+        """Test that identifiers named after other languages' keywords are not decision points."""
+        from services import CodeAnalyzerService
+
+        analyzer = CodeAnalyzerService()
+        identifiers = "switch = 1\nwhen = 2\ncatch = 3\nunless = 4\nrescue = 5\n"
+
+        assert analyzer._count_decision_points(identifiers, "python") == 0
+        assert analyzer._count_decision_points("if a:\n    pass\nelif b:\n    pass\n", "python") == 2
+
+    def test_analyze_empty_code(self, test_client: TestClient):
+        """Test that empty code is rejected by request validation."""
+        request = {
+            "code": "",
+            "language": "python"
+        }
+
+        response = test_client.post("/api/analyze", json=request)
+
+        assert response.status_code == 422
+        assert json_fast(response)["detail"][0]["loc"] == ["body", "code"]
 
     def test_analyze_javascript_code(self, test_client: TestClient):
         """Test analyzing JavaScript code."""
         request = {
-            "code": """
-function helloWorld() {
-    console.log("Hello, World!");
-    return true;
-}
-""",
+            "code": _JS_HELLO_CODE,
             "language": "javascript"
         }
 
         response = test_client.post("/api/analyze", json=request)
 
         assert response.status_code == 200
-        data = response.json()
+        data = json_fast(response)
 
         assert data["syntax_valid"] is True
         assert "complexity" in data
         assert "lines_of_code" in data
 
+    def test_analyze_repeat_request_uses_cache(self, test_client: TestClient):
+        """Test that identical analysis requests are served from the cache."""
+        from api.endpoints import analyze
+
+        request = {
+            "code": "def cached():\n    return 42\n",
+            "language": "python"
+        }
+        analyze.analysis_cache.clear()
+
+        analyzer_service = analyze.get_analyzer_service()
+        with patch.object(
+            analyzer_service,
+            "analyze_code",
+            wraps=analyzer_service.analyze_code
+        ) as mock_analyze:
+            first = test_client.post("/api/analyze", json=request)
+            second = test_client.post("/api/analyze", json=request)
+
+        assert first.status_code == 200
+        assert json_fast(first) == json_fast(second)
+        assert mock_analyze.call_count == 1
+
+    def test_analyze_etag_not_modified(
+        self,
+        test_client: TestClient,
+        sample_analyze_request
+    ):
+        """Test that a matching If-None-Match header returns 304 Not Modified."""
+        first = test_client.post("/api/analyze", json=dict(sample_analyze_request))
+
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+
+        second = test_client.post(
+            "/api/analyze",
+            json=dict(sample_analyze_request),
+            headers={"If-None-Match": etag}
+        )
+
+        assert second.status_code == 304
+        assert second.headers["etag"] == etag
+        assert second.content == b""
+
+    def test_analyze_etag_wildcard_is_not_a_match(
+        self,
+        test_client: TestClient,
+        sample_analyze_request
+    ):
+        """Test that If-None-Match: * does not short-circuit the analysis POST."""
+        response = test_client.post(
+            "/api/analyze",
+            json=dict(sample_analyze_request),
+            headers={"If-None-Match": "*"}
+        )
+
+        assert response.status_code == 200
+        assert json_fast(response)["syntax_valid"] is True
+
+    def test_analyze_etag_changes_with_grammar_version(
+        self,
+        test_client: TestClient,
+        sample_analyze_request,
+        monkeypatch
+    ):
+        """Test that a parser grammar upgrade invalidates earlier ETags."""
+        from api.endpoints import analyze
+
+        first = test_client.post("/api/analyze", json=dict(sample_analyze_request))
+        monkeypatch.setattr(analyze, "GRAMMAR_VERSION", "upgraded-grammar")
+        second = test_client.post(
+            "/api/analyze",
+            json=dict(sample_analyze_request),
+            headers={"If-None-Match": first.headers["etag"]}
+        )
+
+        assert second.status_code == 200
+        assert second.headers["etag"] != first.headers["etag"]
+
+    def test_validate_reports_syntax_errors(self, test_client: TestClient):
+        """Test that the validate endpoint flags broken code without full analysis."""
+        request = {
+            "code": "def broken_function(\n    print('missing closing parenthesis'",
+            "language": "python"
+        }
+
+        response = test_client.post("/api/analyze/validate", json=request)
+
+        assert response.status_code == 200
+        data = json_fast(response)
+
+        assert data["valid"] is False
+        assert data["language"] == "python"
+        assert len(data["issues"]) > 0
+
     def test_analyze_missing_code(self, test_client: TestClient):
         """Test analysis with missing code field."""
         request = {
@@ -142,24 +387,18 @@ function helloWorld() {
     def test_analyze_with_performance_metrics(self, test_client: TestClient):
         """Test that analysis includes performance metrics."""
         request = {
-            "code": """
-def fibonacci(n):
-    if n <= 1:
-        return n
-    return fibonacci(n-1) + fibonacci(n-2)
-""",
+            "code": _FIBONACCI_CODE,
             "language": "python"
         }
 
         response = test_client.post("/api/analyze", json=request)
 
         assert response.status_code == 200
-        data = response.json()
+        data = json_fast(response)
 
         assert "performance_score" in data
         assert data["performance_score"] >= 0
         assert data["performance_score"] <= 100
 
         # Should have suggestions about recursion
-        assert any("recursion" in s.lower() or "performance" in s.lower()
-                  for s in data.get("suggestions", []))
\ No newline at end of file
+        assert _RECURSION_OR_PERFORMANCE_RE.search("\n".join(data.get("suggestions", [])))
\ No newline at end of file
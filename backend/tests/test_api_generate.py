@@ -1,37 +1,47 @@
 """Integration tests for code generation endpoint."""
+import httpx
+import orjson
 import pytest
 from unittest.mock import patch, Mock, AsyncMock
 from fastapi.testclient import TestClient
 
+from test_fixtures import json_fast
+
+_AUTH_HEADERS = {"Authorization": "Bearer test-api-key"}
+
 
 @pytest.mark.integration
 @pytest.mark.api
 class TestGenerateEndpoint:
     """Test suite for code generation endpoint."""
 
-    @patch('services.code_generator.ChatOpenAI')
-    def test_generate_code_success(
+    async def test_generate_code_success(
         self,
-        mock_openai,
-        test_client: TestClient,
-        sample_generation_request,
+        mock_chat_openai,
+        llm_message,
+        async_client: httpx.AsyncClient,
+        make_generation_request,
         mock_openai_response
     ):
         """Test successful code generation."""
         # Setup mock
         mock_llm = Mock()
-        mock_openai.return_value = mock_llm
-        mock_llm.invoke = Mock(return_value=Mock(content=mock_openai_response["choices"][0]["message"]["content"]))
+        mock_chat_openai.return_value = mock_llm
+        mock_llm.ainvoke = AsyncMock(return_value=llm_message(mock_openai_response["choices"][0]["message"]["content"]))
 
-        response = test_client.post("/api/generate", json=sample_generation_request)
+        response = await async_client.post(
+            "/api/generate",
+            json=make_generation_request(include_tests=False, include_docs=False),
+            headers=_AUTH_HEADERS
+        )
 
         assert response.status_code == 200
-        data = response.json()
+        data = json_fast(response)
 
         assert "id" in data
-        assert "code" in data
-        assert "language" in data
+        assert data["code"].startswith("def hello_world():")
         assert data["language"] == "python"
+        mock_llm.ainvoke.assert_awaited_once()
 
     def test_generate_code_missing_prompt(self, test_client: TestClient):
         """Test code generation with missing prompt."""
@@ -42,6 +52,16 @@ class TestGenerateEndpoint:
         response = test_client.post("/api/generate", json=request_data)
         assert response.status_code == 422  # Unprocessable Entity
 
+    def test_generate_code_short_prompt(self, test_client: TestClient):
+        """Test that prompts under 10 characters after stripping are rejected."""
+        request_data = {
+            "prompt": "   short    ",
+            "programming_language": "python"
+        }
+
+        response = test_client.post("/api/generate", json=request_data)
+        assert response.status_code == 422
+
     def test_generate_code_invalid_language(self, test_client: TestClient):
         """Test code generation with invalid programming language."""
         request_data = {
@@ -52,105 +72,267 @@ class TestGenerateEndpoint:
         response = test_client.post("/api/generate", json=request_data)
         assert response.status_code == 422
 
-    @patch('services.code_generator.ChatOpenAI')
-    def test_generate_with_tests(
+    async def test_generate_with_tests(
         self,
-        mock_openai,
-        test_client: TestClient,
-        sample_generation_request,
+        mock_chat_openai,
+        llm_message,
+        async_client: httpx.AsyncClient,
+        make_generation_request,
         mock_openai_response,
         mock_openai_test_response
     ):
         """Test code generation with test generation enabled."""
         # Setup mock
         mock_llm = Mock()
-        mock_openai.return_value = mock_llm
-        mock_llm.invoke = Mock(side_effect=[
-            Mock(content=mock_openai_response["choices"][0]["message"]["content"]),
-            Mock(content=mock_openai_test_response["choices"][0]["message"]["content"])
-        ])
+        mock_chat_openai.return_value = mock_llm
+        mock_llm.ainvoke = AsyncMock(side_effect=iter((
+            llm_message(mock_openai_response["choices"][0]["message"]["content"]),
+            llm_message(mock_openai_test_response["choices"][0]["message"]["content"])
+        )))
 
-        request = sample_generation_request.copy()
-        request["include_tests"] = True
-
-        response = test_client.post("/api/generate", json=request)
+        response = await async_client.post(
+            "/api/generate",
+            json=make_generation_request(include_docs=False),
+            headers=_AUTH_HEADERS
+        )
 
         assert response.status_code == 200
-        data = response.json()
+        data = json_fast(response)
 
-        assert "tests" in data
-        assert data["tests"] is not None
+        assert "TestHelloWorld" in data["tests"]["test_code"]
+        assert mock_llm.ainvoke.await_count == 2
 
-    @patch('services.code_generator.ChatOpenAI')
-    def test_generate_with_documentation(
+    async def test_generate_with_documentation(
         self,
-        mock_openai,
-        test_client: TestClient,
-        sample_generation_request,
+        mock_chat_openai,
+        llm_message,
+        async_client: httpx.AsyncClient,
+        make_generation_request,
         mock_openai_response,
         mock_openai_docs_response
     ):
         """Test code generation with documentation enabled."""
         # Setup mock
         mock_llm = Mock()
-        mock_openai.return_value = mock_llm
-        mock_llm.invoke = Mock(side_effect=[
-            Mock(content=mock_openai_response["choices"][0]["message"]["content"]),
-            Mock(content=mock_openai_docs_response["choices"][0]["message"]["content"])
-        ])
-
-        request = sample_generation_request.copy()
-        request["include_documentation"] = True
+        mock_chat_openai.return_value = mock_llm
+        mock_llm.ainvoke = AsyncMock(side_effect=iter((
+            llm_message(mock_openai_response["choices"][0]["message"]["content"]),
+            llm_message(mock_openai_docs_response["choices"][0]["message"]["content"])
+        )))
 
-        response = test_client.post("/api/generate", json=request)
+        response = await async_client.post(
+            "/api/generate",
+            json=make_generation_request(include_tests=False),
+            headers=_AUTH_HEADERS
+        )
 
         assert response.status_code == 200
-        data = response.json()
+        data = json_fast(response)
 
-        assert "documentation" in data
         assert data["documentation"] is not None
+        assert mock_llm.ainvoke.await_count == 2
 
-    def test_generate_all_languages(self, test_client: TestClient):
-        """Test that all supported languages are accepted."""
-        languages = [
-            "python", "javascript", "typescript", "java",
-            "csharp", "go", "rust", "cpp", "ruby", "swift"
-        ]
-
-        for lang in languages:
-            with patch('services.code_generator.ChatOpenAI') as mock_openai:
-                mock_llm = Mock()
-                mock_openai.return_value = mock_llm
-                mock_llm.invoke = Mock(return_value=Mock(content="// Sample code"))
+    @pytest.mark.parametrize("lang", [
+        "python", "javascript", "typescript", "java",
+        "csharp", "go", "rust", "cpp", "ruby", "swift"
+    ])
+    def test_generate_all_languages(self, lang, mock_chat_openai, llm_message, test_client: TestClient):
+        """Test that every supported language is accepted."""
+        mock_llm = Mock()
+        mock_chat_openai.return_value = mock_llm
+        mock_llm.ainvoke = AsyncMock(return_value=llm_message("// Sample code"))
 
-                request = {
-                    "prompt": "Hello world",
-                    "programming_language": lang
-                }
+        request = {
+            "prompt": "Hello world",
+            "programming_language": lang
+        }
 
-                response = test_client.post("/api/generate", json=request)
-                assert response.status_code == 200, f"Failed for language: {lang}"
+        response = test_client.post("/api/generate", json=request, headers=_AUTH_HEADERS)
+        assert response.status_code == 200, f"Failed for language: {lang}"
+        assert json_fast(response)["code"] == "// Sample code"
 
-    @patch('services.code_generator.ChatOpenAI')
-    def test_generate_with_metrics(
+    async def test_generate_with_metrics(
         self,
-        mock_openai,
-        test_client: TestClient,
-        sample_generation_request
+        mock_chat_openai,
+        llm_message,
+        async_client: httpx.AsyncClient,
+        make_generation_request
     ):
         """Test that code generation includes metrics."""
         # Setup mock
         mock_llm = Mock()
-        mock_openai.return_value = mock_llm
-        mock_llm.invoke = Mock(return_value=Mock(content="def test():\n    pass"))
+        mock_chat_openai.return_value = mock_llm
+        mock_llm.ainvoke = AsyncMock(return_value=llm_message("def test():\n    pass"))
+
+        response = await async_client.post(
+            "/api/generate",
+            json=make_generation_request(include_tests=False, include_docs=False),
+            headers=_AUTH_HEADERS
+        )
+
+        assert response.status_code == 200
+        data = json_fast(response)
+
+        assert data["metrics"]["lines_of_code"] == 2
+        assert "cyclomatic_complexity" in data["metrics"]
+        assert "readability_score" in data["metrics"]
+
+    def test_generate_batch_isolates_failures(self, test_client: TestClient):
+        """Test that a failing batch item does not cancel the other generations."""
+        from models import GenerationResponse, GenerationStatus
+
+        async def fake_generate(request, api_key):
+            if request.programming_language.value == "go":
+                raise RuntimeError("boom")
+            return GenerationResponse(
+                id="gen_test",
+                status=GenerationStatus.COMPLETED,
+                code="print('ok')",
+                language=request.programming_language.value
+            )
+
+        batch = {
+            "requests": [
+                {"prompt": "Create a hello world function", "programming_language": "python"},
+                {"prompt": "Create a hello world function", "programming_language": "go"}
+            ]
+        }
+
+        with patch("api.endpoints.generate.generate_code_async", side_effect=fake_generate):
+            response = test_client.post(
+                "/api/generate/batch",
+                json=batch,
+                headers={"Authorization": "Bearer test-api-key"}
+            )
+
+        assert response.status_code == 200
+        data = json_fast(response)
+
+        assert [item["language"] for item in data] == ["python", "go"]
+        assert data[0]["status"] == "completed"
+        assert data[1]["status"] == "failed"
+        assert data[1]["error"] == "boom"
+
+    def test_generate_stream_emits_events(self, test_client: TestClient):
+        """Test that streamed generation emits code body tokens followed by the extracted code."""
+        from models import CodeMetrics
+
+        async def fake_stream(request):
+            for chunk in ["Here you go:\n```py", "thon\nprint(", "'hi')\n`", "``"]:
+                yield chunk
+
+        service = Mock()
+        service.generate_code_stream = fake_stream
+        service.extract_code = Mock(return_value="print('hi')")
+        service.calculate_metrics = AsyncMock(return_value=CodeMetrics(
+            lines_of_code=1,
+            cyclomatic_complexity=1,
+            readability_score=100.0
+        ))
+
+        request = {
+            "prompt": "Create a hello world function",
+            "programming_language": "python",
+            "include_tests": False,
+            "include_docs": False
+        }
+
+        with patch("api.endpoints.generate.get_generator_service", return_value=service):
+            response = test_client.post(
+                "/api/generate/stream",
+                json=request,
+                headers={"Authorization": "Bearer test-api-key"}
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = [
+            line.removeprefix("event: ")
+            for line in response.text.splitlines()
+            if line.startswith("event: ")
+        ]
+        tokens = [
+            orjson.loads(line.removeprefix("data: "))["content"]
+            for line in response.text.splitlines()
+            if line.startswith("data: ") and '"content"' in line
+        ]
+        assert events == ["start", "token", "token", "code", "metrics", "done"]
+        assert "".join(tokens) == "print('hi')"
+
+    def test_generate_bundles_tests_and_docs(self, test_client: TestClient):
+        """Test that requesting tests and docs uses one bundled LLM call."""
+        from models import CodeMetrics, Documentation, TestResult
+
+        service = Mock()
+        service.generate_bundle = AsyncMock(return_value=(
+            "def hello_world():\n    return 'Hello, World!'",
+            TestResult(test_code="def test_hello(): pass", framework="pytest", coverage_estimate=50.0, test_count=1),
+            Documentation(inline_comments="# Says hello")
+        ))
+        service.generate_code = AsyncMock()
+        service.calculate_metrics = AsyncMock(return_value=CodeMetrics(
+            lines_of_code=2,
+            cyclomatic_complexity=1,
+            readability_score=100.0
+        ))
+
+        request = {
+            "prompt": "Create a hello world function",
+            "programming_language": "python",
+            "include_tests": True,
+            "include_docs": True
+        }
+
+        with patch("api.endpoints.generate.get_generator_service", return_value=service):
+            response = test_client.post(
+                "/api/generate",
+                json=request,
+                headers={"Authorization": "Bearer test-api-key"}
+            )
+
+        assert response.status_code == 200
+        data = json_fast(response)
+
+        assert data["tests"]["framework"] == "pytest"
+        assert data["documentation"]["inline_comments"] == "# Says hello"
+        service.generate_bundle.assert_awaited_once()
+        service.generate_code.assert_not_awaited()
+
+    def test_generate_stream_requires_api_key(self, test_client: TestClient):
+        """Test that streamed generation rejects requests without an API key."""
+        request = {
+            "prompt": "Create a hello world function",
+            "programming_language": "python"
+        }
+
+        response = test_client.post("/api/generate/stream", json=request)
+        assert response.status_code == 401
+
+    def test_generate_batch_deduplicates_identical_requests(self, test_client: TestClient):
+        """Test that identical batch items share one generation but get distinct IDs."""
+        from models import GenerationResponse, GenerationStatus
+
+        fake_generate = AsyncMock(side_effect=lambda request, api_key: GenerationResponse(
+            id="gen_original",
+            status=GenerationStatus.COMPLETED,
+            code="print('ok')",
+            language=request.programming_language.value
+        ))
+
+        item = {"prompt": "Create a hello world function", "programming_language": "python"}
 
-        response = test_client.post("/api/generate", json=sample_generation_request)
+        with patch("api.endpoints.generate.generate_code_async", fake_generate):
+            response = test_client.post(
+                "/api/generate/batch",
+                json={"requests": [item, item]},
+                headers={"Authorization": "Bearer test-api-key"}
+            )
 
         assert response.status_code == 200
-        data = response.json()
+        data = json_fast(response)
 
-        assert "metrics" in data
-        if data["metrics"]:
-            assert "lines_of_code" in data["metrics"]
-            assert "cyclomatic_complexity" in data["metrics"]
-            assert "readability_score" in data["metrics"]
\ No newline at end of file
+        assert fake_generate.await_count == 1
+        assert len(data) == 2
+        assert data[0]["code"] == data[1]["code"]
+        assert data[0]["id"] != data[1]["id"]
@@ -1,43 +1,117 @@
-"""Integration tests for health check endpoint."""
+"""Integration tests for liveness and readiness endpoints."""
+import asyncio
 import pytest
+from unittest.mock import patch
 from fastapi.testclient import TestClient
 
+from test_fixtures import json_fast
+
+# Readiness body fields and the check each value must pass
+_READY_FIELDS = (
+    ("status", lambda value: value == "healthy"),
+    ("timestamp", lambda value: isinstance(value, str)),
+    ("version", lambda value: isinstance(value, str)),
+    ("services", lambda value: isinstance(value, dict))
+)
+
 
 @pytest.mark.integration
 @pytest.mark.api
 class TestHealthEndpoint:
     """Test suite for health check endpoint."""
 
-    def test_health_check_returns_200(self, test_client: TestClient):
-        """Test that health check endpoint returns 200 status."""
-        response = test_client.get("/api/health")
+    @pytest.mark.parametrize("key,predicate", _READY_FIELDS, ids=[key for key, _ in _READY_FIELDS])
+    def test_health_check_fields(self, api_snapshots, api_status_codes, key, predicate):
+        """Test readiness returns 200 with each expected field."""
+        assert api_status_codes["ready"] == 200
+        assert predicate(api_snapshots["ready"][key])
+
+    def test_liveness_skips_dependency_probes(self, test_client: TestClient):
+        """Test that liveness returns a static body without running health checks."""
+        from api.endpoints import health
+
+        with patch.object(health, "health_check", wraps=health.health_check) as mock_check:
+            response = test_client.get("/api/health")
+
         assert response.status_code == 200
+        assert json_fast(response) == {"status": "ok", "version": health.settings.app_version}
+        assert mock_check.await_count == 0
 
-    def test_health_check_response_structure(self, test_client: TestClient):
-        """Test health check response has correct structure."""
-        response = test_client.get("/api/health")
-        data = response.json()
+    def test_health_check_reports_unreachable_redis(self, test_client: TestClient, monkeypatch):
+        """Test that a failing dependency probe degrades status instead of erroring."""
+        from api.endpoints import health
 
-        assert "status" in data
-        assert "timestamp" in data
-        assert "version" in data
-        assert "services" in data
+        monkeypatch.setattr(health.settings, "use_cache", True)
+        monkeypatch.setattr(health.settings, "redis_url", "redis://127.0.0.1:1/0")
+
+        response = test_client.get("/api/health/ready")
+        data = json_fast(response)
+
+        assert response.status_code == 503
+        assert data["status"] == "degraded"
+        assert data["services"]["redis"] in ("disconnected", "timeout")
+        assert data["services"]["openai"] == "connected"
+
+    def test_health_check_reports_probe_timeout(self, test_client: TestClient, monkeypatch):
+        """Test that a hung dependency probe is reported as a timeout with 503."""
+        from api.endpoints import health
+
+        async def hung_redis():
+            await asyncio.sleep(1)
+            return "redis", "connected"
+
+        monkeypatch.setattr(health.settings, "use_cache", True)
+        monkeypatch.setattr(health.settings, "health_probe_timeout", 0.05)
+        monkeypatch.setattr(health, "_check_redis", hung_redis)
 
-    def test_health_check_status_value(self, test_client: TestClient):
-        """Test health check returns healthy status."""
-        response = test_client.get("/api/health")
-        data = response.json()
+        response = test_client.get("/api/health/ready")
+        data = json_fast(response)
 
-        assert data["status"] == "healthy"
-        assert "services" in data
-        assert isinstance(data["services"], dict)
+        assert response.status_code == 503
+        assert data["status"] == "degraded"
+        assert data["services"]["redis"] == "timeout"
 
-    def test_root_endpoint(self, test_client: TestClient):
+    def test_health_check_is_cached(self, test_client: TestClient):
+        """Test that repeated probes within the TTL reuse the cached result."""
+        from api.endpoints import health
+
+        with patch.object(health, "health_check", wraps=health.health_check) as mock_check:
+            first = test_client.get("/api/health/ready")
+            second = test_client.get("/api/health/ready")
+
+        assert json_fast(first) == json_fast(second)
+        assert mock_check.await_count == 1
+
+    def test_health_check_rejects_other_methods(self, test_client: TestClient):
+        """Test that the health interceptor only answers GET and HEAD."""
+        response = test_client.post("/api/health")
+
+        assert response.status_code == 405
+        assert response.headers["allow"] == "GET, HEAD"
+
+    def test_health_routes_in_openapi_schema(self, test_client: TestClient):
+        """Test that the intercepted health probes are still documented."""
+        paths = json_fast(test_client.get("/api/openapi.json"))["paths"]
+
+        assert "get" in paths["/api/health"]
+        assert "get" in paths["/api/health/ready"]
+
+    def test_health_router_answers_without_interceptor(self, api_snapshots):
+        """Test that the FastAPI health routes serve the same bodies as the interceptor."""
+        from main import fastapi_app
+
+        client = TestClient(fastapi_app)
+
+        assert json_fast(client.get("/api/health")) == api_snapshots["health"]
+        ready = json_fast(client.get("/api/health/ready"))
+        assert ready.keys() == api_snapshots["ready"].keys()
+        assert ready["services"] == api_snapshots["ready"]["services"]
+
+    def test_root_endpoint(self, api_snapshots, api_status_codes):
         """Test root endpoint returns API information."""
-        response = test_client.get("/")
-        assert response.status_code == 200
+        assert api_status_codes["root"] == 200
 
-        data = response.json()
+        data = api_snapshots["root"]
         assert "name" in data
         assert "version" in data
         assert "status" in data
@@ -1,95 +1,95 @@
 """Integration tests for languages endpoint."""
 import pytest
+from itertools import pairwise
+from unittest.mock import patch
 from fastapi.testclient import TestClient
 
+from test_fixtures import json_fast
+
+# (code, display name, minimum version, expected test framework)
+_EXPECTED_METADATA = (
+    ("python", "Python", "3.8+", "pytest"),
+    ("javascript", "JavaScript", "ES6+", "jest"),
+    ("typescript", "TypeScript", "4.0+", "jest"),
+    ("java", "Java", "11+", "junit")
+)
+
 
 @pytest.mark.integration
 @pytest.mark.api
 class TestLanguagesEndpoint:
     """Test suite for languages endpoint."""
 
-    def test_get_languages_returns_200(self, test_client: TestClient):
-        """Test that languages endpoint returns 200 status."""
-        response = test_client.get("/api/languages")
-        assert response.status_code == 200
+    def test_get_languages_returns_200(self, api_status_codes, api_snapshots):
+        """Test that the session snapshot holds the languages endpoint's 200 response."""
+        assert api_status_codes["languages"] == 200
+        assert set(api_snapshots["languages"]) == {"programming_languages", "natural_languages", "test_frameworks"}
 
-    def test_get_languages_response_structure(self, test_client: TestClient):
+    def test_get_languages_response_structure(self, api_snapshots):
         """Test languages response has correct structure."""
-        response = test_client.get("/api/languages")
-        data = response.json()
+        data = api_snapshots["languages"]
 
-        assert "languages" in data
-        assert isinstance(data["languages"], list)
-        assert len(data["languages"]) > 0
+        assert isinstance(data["programming_languages"], list)
+        assert len(data["programming_languages"]) > 0
+        assert isinstance(data["natural_languages"], list)
+        assert isinstance(data["test_frameworks"], dict)
 
-    def test_get_languages_contains_expected_languages(self, test_client: TestClient):
+    def test_get_languages_contains_expected_languages(self, languages_by_value):
         """Test that response contains all expected programming languages."""
         expected_languages = [
             "python", "javascript", "typescript", "java",
             "csharp", "go", "rust", "cpp", "ruby", "swift"
         ]
 
-        response = test_client.get("/api/languages")
-        data = response.json()
+        actual = languages_by_value.keys()
+        missing = set(expected_languages) - actual
+        assert not missing, f"Missing languages: {sorted(missing)}"
 
-        languages = data["languages"]
-        language_values = [lang["value"] for lang in languages]
+    def test_language_object_structure(self, languages_by_value):
+        """Test that each language object has correct structure."""
+        required = {"code", "name", "version"}
 
-        for expected in expected_languages:
-            assert expected in language_values, f"Missing language: {expected}"
+        for code, language in languages_by_value.items():
+            missing = required - language.keys()
+            assert not missing, f"{code} is missing {sorted(missing)}"
+            assert all(isinstance(language[key], str) for key in required)
 
-    def test_language_object_structure(self, test_client: TestClient):
-        """Test that each language object has correct structure."""
-        response = test_client.get("/api/languages")
-        data = response.json()
-
-        for language in data["languages"]:
-            assert "value" in language
-            assert "label" in language
-            assert "extension" in language
-            assert "test_framework" in language
-            assert isinstance(language["value"], str)
-            assert isinstance(language["label"], str)
-            assert isinstance(language["extension"], str)
-
-    def test_language_metadata_correctness(self, test_client: TestClient):
+    @pytest.mark.parametrize("code, name, version, framework", _EXPECTED_METADATA)
+    def test_language_metadata_correctness(self, code, name, version, framework, languages_by_value, api_snapshots):
         """Test that language metadata is correct."""
-        response = test_client.get("/api/languages")
-        data = response.json()
+        language = languages_by_value[code]
 
-        # Check a few specific languages for correct metadata
-        languages_dict = {lang["value"]: lang for lang in data["languages"]}
+        assert (language["name"], language["version"]) == (name, version)
+        assert framework in api_snapshots["languages"]["test_frameworks"][code]
 
-        # Python
-        assert languages_dict["python"]["extension"] == ".py"
-        assert languages_dict["python"]["label"] == "Python"
-        assert "pytest" in languages_dict["python"]["test_framework"].lower()
+    def test_get_test_frameworks(self, test_client: TestClient):
+        """Test framework lookup for known and unknown languages."""
+        response = test_client.get("/api/languages/python/frameworks")
 
-        # JavaScript
-        assert languages_dict["javascript"]["extension"] == ".js"
-        assert languages_dict["javascript"]["label"] == "JavaScript"
-        assert "jest" in languages_dict["javascript"]["test_framework"].lower()
+        assert response.status_code == 200
+        assert "pytest" in json_fast(response)
 
-        # TypeScript
-        assert languages_dict["typescript"]["extension"] == ".ts"
-        assert languages_dict["typescript"]["label"] == "TypeScript"
+        unknown = test_client.get("/api/languages/cobol/frameworks")
 
-        # Java
-        assert languages_dict["java"]["extension"] == ".java"
-        assert languages_dict["java"]["label"] == "Java"
-        assert "junit" in languages_dict["java"]["test_framework"].lower()
+        assert unknown.status_code == 200
+        assert json_fast(unknown) == []
 
-    def test_languages_endpoint_is_cached(self, test_client: TestClient):
-        """Test that languages endpoint returns consistent results (cached)."""
-        response1 = test_client.get("/api/languages")
-        response2 = test_client.get("/api/languages")
+    def test_parameterless_routes_skip_dependency_solving(self, test_client: TestClient):
+        """Test that FastRoute serves static endpoints without solving dependencies."""
+        with patch("fastapi.routing.solve_dependencies") as mock_solve:
+            response = test_client.get("/api/languages/programming")
 
-        assert response1.json() == response2.json()
+        assert response.status_code == 200
+        assert "python" in json_fast(response)
+        mock_solve.assert_not_called()
 
-    def test_languages_sorted_alphabetically(self, test_client: TestClient):
-        """Test that languages are sorted alphabetically by label."""
+    def test_languages_endpoint_is_cached(self, test_client: TestClient, api_snapshots):
+        """Test that languages endpoint returns consistent results (cached)."""
         response = test_client.get("/api/languages")
-        data = response.json()
 
-        labels = [lang["label"] for lang in data["languages"]]
-        assert labels == sorted(labels), "Languages should be sorted alphabetically"
\ No newline at end of file
+        assert json_fast(response) == api_snapshots["languages"]
+
+    def test_language_names_are_unique(self, languages_by_value):
+        """Test that no two programming languages share a display name."""
+        names = sorted(language["name"] for language in languages_by_value.values())
+        assert all(a < b for a, b in pairwise(names)), "Language names should be unique"
\ No newline at end of file
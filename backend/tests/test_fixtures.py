@@ -1,31 +1,24 @@
 """Test fixtures and mock data for integration tests."""
-from typing import Dict, Any
+from functools import cache
+from pathlib import Path
+from typing import Any, Dict, Final
 
+import orjson
 
-class MockResponses:
-    """Collection of mock responses for testing."""
+_FIXTURES_DIR: Final[Path] = Path(__file__).parent / "fixtures"
 
-    @staticmethod
-    def python_hello_world() -> str:
-        """Python hello world function."""
-        return """def hello_world():
+_PYTHON_HELLO_WORLD: Final[str] = """def hello_world():
     '''A simple hello world function.'''
     return "Hello, World!"
 """
 
-    @staticmethod
-    def javascript_hello_world() -> str:
-        """JavaScript hello world function."""
-        return """function helloWorld() {
+_JAVASCRIPT_HELLO_WORLD: Final[str] = """function helloWorld() {
     // A simple hello world function
     return "Hello, World!";
 }
 """
 
-    @staticmethod
-    def python_fibonacci() -> str:
-        """Python fibonacci function."""
-        return """def fibonacci(n):
+_PYTHON_FIBONACCI: Final[str] = """def fibonacci(n):
     '''Calculate fibonacci number at position n.'''
     if n <= 0:
         return 0
@@ -35,10 +28,7 @@ class MockResponses:
         return fibonacci(n-1) + fibonacci(n-2)
 """
 
-    @staticmethod
-    def python_test_hello_world() -> str:
-        """Python test for hello world."""
-        return """import unittest
+_PYTHON_TEST_HELLO_WORLD: Final[str] = """import unittest
 from main import hello_world
 
 class TestHelloWorld(unittest.TestCase):
@@ -56,10 +46,7 @@ if __name__ == '__main__':
     unittest.main()
 """
 
-    @staticmethod
-    def javascript_test_hello_world() -> str:
-        """JavaScript test for hello world."""
-        return """describe('helloWorld', () => {
+_JAVASCRIPT_TEST_HELLO_WORLD: Final[str] = """describe('helloWorld', () => {
     test('returns a string', () => {
         const result = helloWorld();
         expect(typeof result).toBe('string');
@@ -72,57 +59,7 @@ if __name__ == '__main__':
 });
 """
 
-    @staticmethod
-    def documentation_hello_world() -> str:
-        """Documentation for hello world function."""
-        return """# Hello World Function
-
-## Description
-A simple function that returns a greeting message. This function demonstrates
-the basic syntax and structure of a function in the chosen programming language.
-
-## Usage
-
-### Python
-```python
-from main import hello_world
-
-message = hello_world()
-print(message)  # Output: Hello, World!
-```
-
-### JavaScript
-```javascript
-const message = helloWorld();
-console.log(message);  // Output: Hello, World!
-```
-
-## Parameters
-None
-
-## Returns
-- **string**: A greeting message "Hello, World!"
-
-## Examples
-```python
->>> hello_world()
-'Hello, World!'
-```
-
-## Notes
-- This is a basic function with no parameters
-- Always returns the same string value
-- Useful for testing basic functionality
-"""
-
-
-class TestData:
-    """Test data for various scenarios."""
-
-    @staticmethod
-    def complex_python_code() -> str:
-        """Complex Python code for testing analysis."""
-        return """
+_COMPLEX_PYTHON_CODE: Final[str] = """
 import asyncio
 from typing import List, Dict, Optional
 from dataclasses import dataclass
@@ -181,10 +118,7 @@ class UserService:
         print(f"Welcome email sent to {user.email}")
 """
 
-    @staticmethod
-    def invalid_python_code() -> str:
-        """Invalid Python code for error testing."""
-        return """
+_INVALID_PYTHON_CODE: Final[str] = """
 def broken_function(:  # Missing parameter name
     print("This won't work"
     return None  # Missing closing parenthesis above
@@ -194,7 +128,62 @@ class IncompleteClas  # Missing colon
         self.value = 10  # Missing colon above
 """
 
+
+def json_fast(response) -> Any:
+    """Parses a test response body with orjson instead of the stdlib json used by response.json()."""
+    return orjson.loads(response.content)
+
+
+class MockResponses:
+    """Collection of mock responses for testing."""
+
+    @staticmethod
+    def python_hello_world() -> str:
+        """Python hello world function."""
+        return _PYTHON_HELLO_WORLD
+
+    @staticmethod
+    def javascript_hello_world() -> str:
+        """JavaScript hello world function."""
+        return _JAVASCRIPT_HELLO_WORLD
+
+    @staticmethod
+    def python_fibonacci() -> str:
+        """Python fibonacci function."""
+        return _PYTHON_FIBONACCI
+
+    @staticmethod
+    def python_test_hello_world() -> str:
+        """Python test for hello world."""
+        return _PYTHON_TEST_HELLO_WORLD
+
+    @staticmethod
+    def javascript_test_hello_world() -> str:
+        """JavaScript test for hello world."""
+        return _JAVASCRIPT_TEST_HELLO_WORLD
+
+    @staticmethod
+    @cache
+    def documentation_hello_world() -> str:
+        """Documentation for hello world function, read once from fixtures/."""
+        return (_FIXTURES_DIR / "documentation_hello_world.md").read_text(encoding="utf-8")
+
+
+class TestData:
+    """Test data for various scenarios."""
+
+    @staticmethod
+    def complex_python_code() -> str:
+        """Complex Python code for testing analysis."""
+        return _COMPLEX_PYTHON_CODE
+
+    @staticmethod
+    def invalid_python_code() -> str:
+        """Invalid Python code for error testing."""
+        return _INVALID_PYTHON_CODE
+
     @staticmethod
+    @cache
     def various_languages_samples() -> Dict[str, str]:
         """Sample code in various languages."""
         return {
@@ -256,6 +245,7 @@ class APIResponses:
         }
 
     @staticmethod
+    @cache
     def languages_response() -> Dict[str, Any]:
         """Create a mock languages API response."""
         return {